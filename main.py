@@ -9,6 +9,11 @@ from fastapi import FastAPI
 from fastapi.responses import JSONResponse, Response
 import uvicorn
 
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
 from src.infrastructure.telegram.bot import create_bot, setup_bot_commands
 from src.application.emotion_analyzer import EmotionAnalyzer
 from src.core.config import settings
@@ -82,6 +87,9 @@ class FamilyEmotionsApp:
         self.bot_app = None
         self.emotion_analyzer = None
         self.db_manager = None
+        self.usage_events = None
+        self.cache_service = None
+        self.family_bot = None
         self._shutdown_event = asyncio.Event()
     
     async def startup(self):
@@ -119,6 +127,17 @@ class FamilyEmotionsApp:
                 logger.warning(f"Database initialization failed, continuing without database: {db_error}")
                 self.db_manager = None
             
+            # Connect Redis cache (optional)
+            if settings.enable_caching:
+                from src.infrastructure.cache import RedisService, CacheService
+                cache_service = CacheService(RedisService())
+                try:
+                    await cache_service.connect()
+                    self.cache_service = cache_service
+                    logger.info("Redis cache connected")
+                except Exception as cache_error:
+                    logger.warning(f"Redis unavailable, continuing without cache: {cache_error}")
+            
             # Initialize emotion analyzer
             logger.info("Initializing emotion analyzer")
             self.emotion_analyzer = EmotionAnalyzer()
@@ -131,12 +150,18 @@ class FamilyEmotionsApp:
             try:
                 from src.infrastructure.telegram.bot import FamilyEmotionsBot
                 
+                # Usage events are queued and written in batches off the request path
+                if self.db_manager:
+                    from src.infrastructure.monitoring.event_writer import UsageEventWriter
+                    self.usage_events = UsageEventWriter(self.db_manager)
+                    self.usage_events.start()
+                
                 # Create bot instance
                 family_bot = FamilyEmotionsBot(
                     user_service=None,  # Will create on-demand
                     family_service=None,
                     emotion_service=None,
-                    analytics_service=None
+                    analytics_service=self.usage_events
                 )
                 
                 # Inject database manager for service creation (if available)
@@ -146,6 +171,9 @@ class FamilyEmotionsApp:
                 else:
                     logger.info("Bot instance created without database (basic mode)")
                 
+                family_bot.cache_service = self.cache_service
+                self.family_bot = family_bot
+                
                 setup_bot_commands(self.bot_app, bot_instance=family_bot)
                 
             except Exception as e:
@@ -182,6 +210,18 @@ class FamilyEmotionsApp:
                 await self.bot_app.stop()
                 await self.bot_app.shutdown()
             
+            if self.family_bot:
+                # Finish in-flight translations before their Claude client and the pool close
+                await self.family_bot.shutdown()
+                await self.family_bot.close_clients()
+            
+            # Flush queued usage events before the pool goes away
+            if self.usage_events:
+                await self.usage_events.stop()
+            
+            if self.cache_service:
+                await self.cache_service.disconnect()
+            
             # Close database
             if self.db_manager:
                 logger.info("Closing database connections")
@@ -285,6 +325,9 @@ class FamilyEmotionsApp:
             if hasattr(self.bot_app, 'updater') and self.bot_app.updater:
                 await self.bot_app.updater.stop()
             await self.bot_app.stop()
+            # Drain chat jobs while the Bot API client can still deliver their results
+            if self.family_bot:
+                await self.family_bot.shutdown()
             await self.bot_app.shutdown()
             
         except Exception as e:
@@ -366,6 +409,10 @@ if __name__ == "__main__":
     print(f"Claude Model: {settings.anthropic.model}")
     print("==================================================")
     
+    # libuv-based loop for the bot, database and HTTP clients when available
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
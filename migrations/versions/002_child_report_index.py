@@ -0,0 +1,43 @@
+"""Partial index for per-child weekly report queries
+
+Revision ID: 002_child_report_index
+Revises: 001_initial_schema
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002_child_report_index'
+down_revision: Union[str, None] = '001_initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index completed translations by (user, child, newest first)."""
+    
+    # CONCURRENTLY cannot run inside a transaction; build without locking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_emtrans_user_child_created_completed',
+            'emotion_translations',
+            ['user_id', 'child_id', sa.text('created_at DESC')],
+            postgresql_where=sa.text("status = 'completed'"),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Drop the per-child report index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_emtrans_user_child_created_completed',
+            table_name='emotion_translations',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -1,8 +1,9 @@
 """Configuration settings for Family Emotions App."""
 from __future__ import annotations
 
+from functools import cached_property
 from typing import Any, Dict, Optional
-from pydantic import Field, field_validator
+from pydantic import AliasChoices, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -20,14 +21,22 @@ class DatabaseSettings(BaseSettings):
     password: Optional[str] = Field(default=None, description="Database password")
     
     # Connection pool settings
-    pool_size: int = Field(default=10, description="Connection pool size")
-    max_overflow: int = Field(default=20, description="Max overflow connections")
+    pool_size: int = Field(
+        default=20,
+        validation_alias=AliasChoices("DB_POOL_SIZE", "DATABASE_POOL_SIZE", "POOL_SIZE"),
+        description="Connection pool size"
+    )
+    max_overflow: int = Field(
+        default=30,
+        validation_alias=AliasChoices("DB_MAX_OVERFLOW", "DATABASE_MAX_OVERFLOW", "MAX_OVERFLOW"),
+        description="Max overflow connections"
+    )
     pool_timeout: int = Field(default=30, description="Pool timeout in seconds")
-    pool_recycle: int = Field(default=3600, description="Pool recycle time in seconds")
+    pool_recycle: int = Field(default=1800, description="Pool recycle time in seconds")
     
-    @property
+    @cached_property
     def url(self) -> str:
-        """Get database URL."""
+        """Get database URL, normalized to the asyncpg driver once per settings instance."""
         if self.database_url:
             # If DATABASE_URL is provided, use it directly but ensure asyncpg driver
             if self.database_url.startswith("postgres://"):
@@ -78,6 +87,27 @@ class TelegramSettings(BaseSettings):
     # Bot settings
     max_message_length: int = Field(default=4096, description="Max Telegram message length")
     request_timeout: int = Field(default=30, description="Request timeout in seconds")
+    concurrent_updates: int = Field(
+        default=64, description="Max updates processed concurrently (1 = sequential)"
+    )
+    user_context_ttl: int = Field(
+        default=3600, description="Seconds of inactivity before a conversation context is dropped"
+    )
+    user_context_max: int = Field(
+        default=20000, description="Max conversation contexts kept in memory (LRU-evicted)"
+    )
+    rate_limit_retries: int = Field(
+        default=1, description="Retries for Bot API calls rejected with RetryAfter"
+    )
+    user_cache_ttl: float = Field(
+        default=30, description="Seconds a loaded user is reused before re-reading it from the database"
+    )
+    navigation_debounce: float = Field(
+        default=0.2, description="Seconds to wait for further clicks before rendering report navigation"
+    )
+    connection_pool_size: int = Field(
+        default=256, description="HTTP connections shared by concurrent Bot API calls"
+    )
     
     @field_validator("bot_token")
     @classmethod
@@ -105,6 +135,13 @@ class AnthropicSettings(BaseSettings):
     # Rate limiting
     requests_per_minute: int = Field(default=50, description="API requests per minute")
     requests_per_day: int = Field(default=1000, description="API requests per day")
+    tokens_per_minute: int = Field(default=40000, description="API input+output tokens per minute")
+    estimated_request_tokens: int = Field(
+        default=2500, description="Tokens budgeted per Claude call when throttling"
+    )
+    max_concurrent_requests: int = Field(
+        default=8, description="Max Claude API calls in flight at once per bot process"
+    )
     
     # Proxy settings (optional)
     proxy_url: Optional[str] = Field(default=None, alias="ANTHROPIC_PROXY_URL", description="HTTP/SOCKS proxy URL for Claude API")
@@ -1,9 +1,11 @@
 """Dependency injection container for Family Emotions App."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Optional
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .services import UserService, FamilyService, AnalyticsService
@@ -48,11 +50,10 @@ class Container:
         logger.info("Initializing dependency container...")
         
         try:
-            # Initialize database
-            await self._init_database()
-            
-            # Initialize cache
-            await self._init_cache()
+            # Database and cache handshakes are independent; connect both at once
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._init_database())
+                tg.create_task(self._init_cache())
             
             # Initialize external services
             await self._init_external_services()
@@ -147,6 +148,15 @@ class Container:
             bot=self._bot
         )
     
+    async def ping(self):
+        """Round-trip to the database and Redis over the already open pools."""
+        async with self.db_manager.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        
+        if not self._redis_service:
+            raise RuntimeError("Redis service not initialized")
+        await self._redis_service.ping()
+    
     async def cleanup(self):
         """Clean up all resources."""
         logger.info("Cleaning up container...")
@@ -245,6 +255,16 @@ class Container:
             raise RuntimeError("Scheduler not initialized")
         return self._scheduler
     
+    @property
+    def is_connected(self) -> bool:
+        """Check if the database and Redis pools are open."""
+        return bool(
+            self._db_manager
+            and self._db_manager.is_initialized
+            and self._redis_service
+            and self._redis_service.is_connected
+        )
+    
     @property
     def is_initialized(self) -> bool:
         """Check if container is fully initialized."""
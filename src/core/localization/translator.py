@@ -1,6 +1,7 @@
 """Translation system for the Family Emotions Bot."""
 
 import logging
+from functools import lru_cache
 from typing import Dict, Optional, Any, Union
 from pathlib import Path
 import json
@@ -16,6 +17,8 @@ class Translator:
     def __init__(self):
         self._translations: Dict[Language, Dict[str, Any]] = {}
         self._current_language = Language.RUSSIAN  # Default to Russian
+        # Catalogs are static once loaded, so (language, key) resolutions are memoized
+        self._resolve = lru_cache(maxsize=4096)(self._resolve_uncached)
         self._load_translations()
     
     def _load_translations(self):
@@ -34,6 +37,8 @@ class Translator:
             else:
                 logger.warning(f"Translation file not found: {translation_file}")
                 self._translations[lang] = {}
+        
+        self._resolve.cache_clear()
     
     def set_language(self, language: Union[Language, str]):
         """Set the current language."""
@@ -58,8 +63,19 @@ class Translator:
         Returns:
             Translated string
         """
-        lang = language or self._current_language
+        translation = self._resolve(language or self._current_language, key)
+        
+        # Format with parameters if provided
+        if kwargs:
+            try:
+                translation = translation.format(**kwargs)
+            except (KeyError, ValueError) as e:
+                logger.error(f"Translation formatting error for key {key}: {e}")
         
+        return translation
+    
+    def _resolve_uncached(self, lang: Language, key: str) -> str:
+        """Look up the raw template for a key, applying the Russian and key fallbacks."""
         # Get translation from nested dictionary
         translation = self._get_nested_value(
             self._translations.get(lang, {}), 
@@ -78,13 +94,6 @@ class Translator:
             logger.warning(f"Translation not found for key: {key}")
             translation = key
         
-        # Format with parameters if provided
-        if kwargs:
-            try:
-                translation = translation.format(**kwargs)
-            except (KeyError, ValueError) as e:
-                logger.error(f"Translation formatting error for key {key}: {e}")
-        
         return translation
     
     def _get_nested_value(self, data: Dict, key: str) -> Optional[str]:
@@ -3,10 +3,11 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional
+from functools import cached_property
+from typing import Dict, List, Optional, Union
 from uuid import UUID
 
-from sqlalchemy import Boolean, Date, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Date, ForeignKey, Integer, String, Text, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import BaseModel, TimestampMixin, UUIDMixin
@@ -67,6 +68,27 @@ class User(BaseModel, UUIDMixin, TimestampMixin):
         "Checkin", back_populates="user"
     )
     
+    @cached_property
+    def children_by_id(self) -> Dict[str, "Children"]:
+        """Children indexed by stringified id, rebuilt when the collection changes."""
+        return {str(child.id): child for child in self.children}
+    
+    @property
+    def children_count(self) -> int:
+        """Number of children in the family."""
+        return len(self.children_by_id)
+    
+    @property
+    def family_members_count(self) -> int:
+        """Number of additional adult family members."""
+        return len(self.family_members)
+    
+    def get_child(self, child_id: Union[UUID, str, None]) -> Optional["Children"]:
+        """Look up one of the user's children by id."""
+        if child_id is None:
+            return None
+        return self.children_by_id.get(str(child_id))
+    
     def __repr__(self) -> str:
         return f"<User(id={self.id}, telegram_id={self.telegram_id}, name={self.first_name})>"
 
@@ -100,6 +122,11 @@ class Children(BaseModel, UUIDMixin, TimestampMixin):
         "Checkin", back_populates="child"
     )
     
+    @cached_property
+    def display_label(self) -> str:
+        """Name-and-age label for child lists and selection buttons."""
+        return f"{self.name} ({self.age} лет)"
+    
     def __repr__(self) -> str:
         return f"<Children(id={self.id}, name={self.name}, age={self.age})>"
 
@@ -126,4 +153,27 @@ class FamilyMember(BaseModel, UUIDMixin, TimestampMixin):
     user: Mapped["User"] = relationship("User", back_populates="family_members")
     
     def __repr__(self) -> str:
-        return f"<FamilyMember(id={self.id}, name={self.name}, role={self.role})>"
\ No newline at end of file
+        return f"<FamilyMember(id={self.id}, name={self.name}, role={self.role})>"
+
+
+def _invalidate_children_index(target: User, *args) -> None:
+    """Drop the cached children index so the next lookup rebuilds it."""
+    target.__dict__.pop("children_by_id", None)
+
+
+event.listen(User.children, "append", _invalidate_children_index)
+event.listen(User.children, "remove", _invalidate_children_index)
+event.listen(User.children, "set", _invalidate_children_index)
+event.listen(User, "refresh", _invalidate_children_index)
+event.listen(User, "expire", _invalidate_children_index)
+
+
+def _invalidate_display_label(target: Children, *args) -> None:
+    """Drop the cached display label so it reflects the new name or age."""
+    target.__dict__.pop("display_label", None)
+
+
+event.listen(Children.name, "set", _invalidate_display_label)
+event.listen(Children.age, "set", _invalidate_display_label)
+event.listen(Children, "refresh", _invalidate_display_label)
+event.listen(Children, "expire", _invalidate_display_label)
@@ -85,8 +85,9 @@ class FamilyService:
         )
         
         self._session.add(child)
+        # Sessions don't expire on commit and all column defaults are client-side,
+        # so the child is complete without a refresh round-trip
         await self._session.commit()
-        await self._session.refresh(child)
         
         logger.info(f"Added child {child.id} ({name}) to parent {parent_id}")
         return child
@@ -15,6 +15,23 @@ from ..exceptions import ResourceNotFoundError, ValidationError
 
 logger = logging.getLogger(__name__)
 
+# Shown when a weekly report cannot be generated; callers must not cache it
+WEEKLY_REPORT_ERROR_HTML = """
+📊 <b>Еженедельный отчет</b>
+
+❌ <b>Ошибка при генерации отчета</b>
+
+К сожалению, не удалось сгенерировать отчет. Попробуйте позже или обратитесь в поддержку.
+
+<i>Для генерации отчетов нужны данные об анализе эмоций за последние дни.</i>
+"""
+
+
+def report_week_start(weeks_back: int = 0) -> date:
+    """Monday (UTC) of the report week ``weeks_back`` weeks before the current one."""
+    today = datetime.now(timezone.utc).date()
+    return today - timedelta(days=today.weekday() + (7 * weeks_back))
+
 
 class ReportService:
     """Service for generating and managing emotion reports."""
@@ -38,8 +55,7 @@ class ReportService:
             Dict with report data
         """
         # Calculate week boundaries
-        today = datetime.now(timezone.utc).date()
-        week_start = today - timedelta(days=today.weekday() + (7 * weeks_back))
+        week_start = report_week_start(weeks_back)
         week_end = week_start + timedelta(days=6)
         
         logger.info(f"Generating report for week {week_start} to {week_end}")
@@ -84,24 +100,27 @@ class ReportService:
         
         logger.info(f"Found {len(translations)} completed translations for user {user_id} in week {week_start} to {week_end}")
         
-        # Also check for ANY translations (regardless of status) for debugging
-        all_translations_stmt = (
-            select(EmotionTranslation)
-            .where(
-                and_(
-                    EmotionTranslation.user_id == user_id,
-                    EmotionTranslation.created_at >= week_start_dt,
-                    EmotionTranslation.created_at <= week_end_dt
+        # Translations in any status are only worth a second query when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            all_translations_stmt = (
+                select(EmotionTranslation)
+                .where(
+                    and_(
+                        EmotionTranslation.user_id == user_id,
+                        EmotionTranslation.created_at >= week_start_dt,
+                        EmotionTranslation.created_at <= week_end_dt
+                    )
                 )
             )
-        )
-        all_translations_result = await self._session.execute(all_translations_stmt)
-        all_translations = list(all_translations_result.scalars().all())
-        
-        logger.info(f"Found {len(all_translations)} total translations (any status) for user {user_id}")
-        if all_translations:
+            all_translations_result = await self._session.execute(all_translations_stmt)
+            all_translations = list(all_translations_result.scalars().all())
+            
+            logger.debug("Found %d total translations (any status) for user %s", len(all_translations), user_id)
             for trans in all_translations:
-                logger.info(f"Translation {trans.id}: status={trans.status}, created_at={trans.created_at}, emotions={trans.translated_emotions}")
+                logger.debug(
+                    "Translation %s: status=%s, created_at=%s, emotions=%s",
+                    trans.id, trans.status, trans.created_at, trans.translated_emotions
+                )
         
         # Get checkins for the week
         checkins_stmt = (
@@ -119,6 +138,7 @@ class ReportService:
         checkins = list(checkins_result.scalars().all())
         
         # Process data
+        child_names = {c.id: c.name for c in children}
         emotion_counts = {}
         child_activity = {}
         daily_activity = {i: 0 for i in range(7)}  # 0=Monday, 6=Sunday
@@ -131,7 +151,7 @@ class ReportService:
             
             # Count activity per child
             if translation.child_id:
-                child_name = next((c.name for c in children if c.id == translation.child_id), "Unknown")
+                child_name = child_names.get(translation.child_id, "Unknown")
                 child_activity[child_name] = child_activity.get(child_name, 0) + 1
             
             # Count daily activity
@@ -248,12 +268,4 @@ class ReportService:
             
         except Exception as e:
             logger.error(f"Error formatting weekly report: {e}")
-            return f"""
-📊 <b>Еженедельный отчет</b>
-
-❌ <b>Ошибка при генерации отчета</b>
-
-К сожалению, не удалось сгенерировать отчет. Попробуйте позже или обратитесь в поддержку.
-
-<i>Для генерации отчетов нужны данные об анализе эмоций за последние дни.</i>
-"""
\ No newline at end of file
+            return WEEKLY_REPORT_ERROR_HTML
\ No newline at end of file
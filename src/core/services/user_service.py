@@ -76,6 +76,70 @@ class UserService:
         logger.info(f"Created new user: {user.id} (Telegram ID: {telegram_id})")
         return user
     
+    async def create_user_with_child(
+        self,
+        telegram_id: int,
+        first_name: str,
+        child_name: str,
+        child_age: int,
+        last_name: Optional[str] = None,
+        username: Optional[str] = None,
+        language_code: str = "en",
+        personality_traits: Optional[str] = None,
+        interests: Optional[str] = None,
+        special_needs: Optional[str] = None
+    ) -> tuple[User, Children]:
+        """
+        Create a user together with their first child in a single commit.
+        
+        Args:
+            telegram_id: Telegram user ID
+            first_name: User's first name
+            child_name: Child's name
+            child_age: Child's age
+            last_name: User's last name (optional)
+            username: Telegram username (optional)
+            language_code: User's language preference
+            personality_traits: Description of child's personality
+            interests: Child's interests and hobbies
+            special_needs: Any special needs or considerations
+            
+        Returns:
+            Created (User, Children) pair
+            
+        Raises:
+            ValidationError: If user already exists or invalid data
+        """
+        existing_user = await self.get_user_by_telegram_id(telegram_id)
+        if existing_user:
+            raise ValidationError(f"User with Telegram ID {telegram_id} already exists")
+        
+        if child_age < 0 or child_age > 18:
+            raise ValidationError("Child age must be between 0 and 18")
+        
+        child = Children(
+            name=child_name,
+            age=child_age,
+            personality_traits=personality_traits,
+            interests=interests,
+            special_needs=special_needs
+        )
+        user = User(
+            telegram_id=telegram_id,
+            first_name=first_name,
+            last_name=last_name,
+            username=username,
+            language_code=language_code,
+            children=[child]
+        )
+        
+        # Both INSERTs go out in one flush; the child's parent_id comes from the relationship
+        self._session.add(user)
+        await self._session.commit()
+        
+        logger.info(f"Created new user {user.id} with child {child.id} (Telegram ID: {telegram_id})")
+        return user, child
+    
     async def get_user_by_id(self, user_id: UUID) -> Optional[User]:
         """Get user by UUID."""
         stmt = (
@@ -1,10 +1,11 @@
 """Redis caching service for performance optimization."""
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import pickle
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from typing import Any, Optional, Union, Dict, List
 from uuid import UUID
 
@@ -61,6 +62,18 @@ class RedisService:
         except Exception as e:
             logger.error(f"Error disconnecting from Redis: {e}")
     
+    async def ping(self) -> bool:
+        """Round-trip to Redis over the existing pool."""
+        try:
+            if not self._redis:
+                raise CacheError("Redis not connected")
+            
+            return await self._redis.ping()
+            
+        except RedisError as e:
+            logger.error(f"Redis PING error: {e}")
+            raise CacheError(f"Cache PING failed: {str(e)}")
+    
     async def get(self, key: str) -> Optional[str]:
         """Get value by key."""
         try:
@@ -102,6 +115,27 @@ class RedisService:
             logger.error(f"Redis DELETE error for keys {keys}: {e}")
             raise CacheError(f"Cache DELETE failed: {str(e)}")
     
+    async def delete_matching(self, pattern: str, batch_size: int = 500) -> int:
+        """Delete keys matching a glob pattern, walking the keyspace with SCAN rather than KEYS."""
+        try:
+            if not self._redis:
+                raise CacheError("Redis not connected")
+            
+            deleted = 0
+            batch = []
+            async for key in self._redis.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await self._redis.delete(*batch)
+                    batch.clear()
+            if batch:
+                deleted += await self._redis.delete(*batch)
+            return deleted
+            
+        except RedisError as e:
+            logger.error(f"Redis SCAN/DELETE error for pattern {pattern}: {e}")
+            raise CacheError(f"Cache pattern delete failed: {str(e)}")
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists."""
         try:
@@ -243,6 +277,7 @@ class CacheService:
         self.SESSION_PREFIX = "session:"
         self.RATE_LIMIT_PREFIX = "rate_limit:"
         self.ANALYTICS_PREFIX = "analytics:"
+        self.EMOTION_ANALYSIS_PREFIX = "emotion_analysis:"
         
         # Default TTL values (in seconds)
         self.DEFAULT_TTL = 3600  # 1 hour
@@ -251,6 +286,9 @@ class CacheService:
         self.SESSION_TTL = 86400     # 24 hours
         self.RATE_LIMIT_TTL = 86400  # 24 hours
         self.ANALYTICS_TTL = 300     # 5 minutes
+        self.EMOTION_ANALYSIS_TTL = 86400  # 24 hours
+        self.CURRENT_WEEK_REPORT_TTL = 60  # still accumulating translations
+        self.PAST_WEEK_REPORT_TTL = 3600   # 1 hour
     
     async def connect(self):
         """Connect to cache backend."""
@@ -335,6 +373,62 @@ class CacheService:
             return self._deserialize_value(value, dict)
         return None
     
+    # Emotion analysis caching
+    
+    def emotion_analysis_key(self, child_id: UUID, *parts: Optional[str]) -> str:
+        """
+        Build the cache key for a Claude emotion analysis.
+        
+        The child id stays readable so a child's entries can be dropped together;
+        everything that shapes the answer (message, context, name, profile, model) is hashed.
+        """
+        digest = hashlib.sha256("\x1f".join(part or "" for part in parts).encode()).hexdigest()
+        return f"{self.EMOTION_ANALYSIS_PREFIX}{child_id}:{digest}"
+    
+    async def cache_emotion_analysis(self, key: str, analysis_data: Dict[str, Any]) -> bool:
+        """Cache an emotion analysis result under a key from emotion_analysis_key."""
+        value = self._serialize_value(analysis_data)
+        return await self._redis.set(key, value, self.EMOTION_ANALYSIS_TTL)
+    
+    async def get_cached_emotion_analysis(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached emotion analysis result."""
+        value = await self._redis.get(key)
+        if value:
+            return self._deserialize_value(value, dict)
+        return None
+    
+    async def invalidate_child_analyses(self, child_id: UUID) -> int:
+        """Drop all cached emotion analyses for a child."""
+        return await self.clear_cache_pattern(f"{self.EMOTION_ANALYSIS_PREFIX}{child_id}:")
+    
+    # Weekly report caching; weeks are keyed by their Monday (UTC), so a key never changes meaning
+    
+    def _weekly_report_key(self, user_id: UUID, week_start: date) -> str:
+        return f"{self.REPORT_PREFIX}weekly:{user_id}:{week_start.isoformat()}"
+    
+    @staticmethod
+    def _current_week_start() -> date:
+        today = datetime.now(timezone.utc).date()
+        return today - timedelta(days=today.weekday())
+    
+    async def cache_weekly_report(self, user_id: UUID, week_start: date, report_html: str) -> bool:
+        """Cache a rendered weekly report; past weeks live longer than the current one."""
+        if week_start >= self._current_week_start():
+            ttl = self.CURRENT_WEEK_REPORT_TTL
+        else:
+            ttl = self.PAST_WEEK_REPORT_TTL
+        return await self._redis.set(self._weekly_report_key(user_id, week_start), report_html, ttl)
+    
+    async def get_cached_weekly_report(self, user_id: UUID, week_start: date) -> Optional[str]:
+        """Get a cached rendered weekly report."""
+        return await self._redis.get(self._weekly_report_key(user_id, week_start)) or None
+    
+    async def invalidate_weekly_reports(self, user_id: UUID, current_week_only: bool = False) -> int:
+        """Drop a user's cached weekly reports (or just the current week's)."""
+        if current_week_only:
+            return await self._redis.delete(self._weekly_report_key(user_id, self._current_week_start()))
+        return await self.clear_cache_pattern(f"{self.REPORT_PREFIX}weekly:{user_id}:")
+    
     # Session management
     
     async def create_session(
@@ -489,18 +583,12 @@ class CacheService:
     
     async def clear_cache_pattern(self, pattern: str) -> int:
         """Clear cache keys matching pattern (use with caution)."""
-        # This is potentially dangerous and should be used carefully
-        # In production, consider using a more specific approach
         try:
             if not pattern.endswith("*"):
                 pattern += "*"
             
-            # Note: KEYS command should be avoided in production
-            # Consider using SCAN instead for large datasets
-            keys = await self._redis._redis.keys(pattern)
-            if keys:
-                return await self._redis.delete(*keys)
-            return 0
+            # SCAN in batches so a large keyspace never blocks Redis the way KEYS does
+            return await self._redis.delete_matching(pattern)
             
         except Exception as e:
             logger.error(f"Error clearing cache pattern {pattern}: {e}")
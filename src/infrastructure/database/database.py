@@ -2,9 +2,12 @@
 from __future__ import annotations
 
 import logging
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 from contextlib import asynccontextmanager
 
+import orjson
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -18,6 +21,20 @@ from ...core.models.base import BaseModel
 logger = logging.getLogger(__name__)
 
 
+def _create_missing_tables(connection: Connection) -> int:
+    """Create only the mapped tables the database lacks; one catalog query when none are missing."""
+    existing = set(inspect(connection).get_table_names())
+    missing = [table for name, table in BaseModel.metadata.tables.items() if name not in existing]
+    if missing:
+        BaseModel.metadata.create_all(connection, tables=missing)
+    return len(missing)
+
+
+def _json_serializer(value: Any) -> str:
+    """Serialize JSON column values with orjson; asyncpg takes json parameters as text."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class DatabaseManager:
     """Manages database connections and sessions."""
     
@@ -40,6 +57,8 @@ class DatabaseManager:
                 pool_timeout=settings.database.pool_timeout,
                 pool_recycle=settings.database.pool_recycle,
                 pool_pre_ping=True,
+                json_serializer=_json_serializer,
+                json_deserializer=orjson.loads,
                 echo=settings.debug,  # Log SQL queries in debug mode
                 future=True
             )
@@ -66,9 +85,12 @@ class DatabaseManager:
         
         try:
             async with self._engine.begin() as conn:
-                await conn.run_sync(BaseModel.metadata.create_all)
+                created = await conn.run_sync(_create_missing_tables)
             
-            logger.info("Database tables created successfully")
+            if created:
+                logger.info(f"Created {created} missing database tables")
+            else:
+                logger.info("Database tables already up to date")
             
         except Exception as e:
             logger.error(f"Failed to create database tables: {e}")
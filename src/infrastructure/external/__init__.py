@@ -1,8 +1,9 @@
 """External services integration."""
-from .claude_service import ClaudeService
+from .claude_service import ClaudeService, TokenBucket
 from .emotion_service import EmotionService
 
 __all__ = [
     "ClaudeService",
+    "TokenBucket",
     "EmotionService"
 ]
\ No newline at end of file
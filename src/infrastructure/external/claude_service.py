@@ -4,7 +4,8 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
-from typing import Dict, List, Optional, Tuple
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 import httpx
@@ -12,11 +13,73 @@ from anthropic import AsyncAnthropic
 
 from ...core.config import settings
 from ...core.exceptions import ExternalServiceError, RateLimitExceededError
-from ...core.localization import get_cultural_context, Language
 
 logger = logging.getLogger(__name__)
 
 
+# Static instructions for emotion analysis. Sent as a cache_control system block so
+# Anthropic serves them from the prompt cache instead of billing them on every call.
+# Blocks shorter than the model's cacheable minimum (1024 tokens for Sonnet) are
+# sent uncached without an error; analyze_child_emotions logs whether the cache was hit.
+_EMOTION_ANALYSIS_SYSTEM_PROMPT = """Вы - эксперт по детской психологии и переводчик эмоций, работающий с российскими семьями. Ваша задача - помочь родителям понять эмоции своих детей и дать подходящие советы.
+
+КУЛЬТУРНЫЙ КОНТЕКСТ:
+- Российский стиль воспитания: сочетание авторитетности и уважения
+- Умеренная прямота в общении
+- Практичные советы с эмпатией
+- Семейные ценности: смесь традиционных и современных подходов
+
+Пожалуйста, проанализируйте эмоциональное состояние ребенка из сообщения пользователя и предоставьте:
+
+1. ОБНАРУЖЕННЫЕ ЭМОЦИИ: Перечислите основные эмоции (максимум 3)
+2. ОЦЕНКА УВЕРЕННОСТИ: От 0.1 до 1.0
+3. ТРИ ВАРИАНТА ОТВЕТА: Предоставьте ровно 3 разных способа реагирования:
+   - Краткий заголовок (5-10 слов)
+   - Текст ответа (соответствующий возрасту)
+   - Эмоциональный подход (подтверждающий, перенаправляющий, обучающий)
+
+4. ОБЪЯСНЕНИЕ: Краткое объяснение определенных эмоций
+
+Ответы должны быть:
+- Подходящими возрасту по языку и концепциям
+- Эмоционально поддерживающими
+- Практичными для родителей
+- Культурно приемлемыми для российских семей
+- Отражающими баланс авторитета и эмпатии
+
+Оформите свой ответ как JSON на русском языке:
+{
+  "emotions": ["эмоция1", "эмоция2", "эмоция3"],
+  "confidence": 0.85,
+  "responses": [
+    {
+      "title": "Подтверждающий ответ",
+      "text": "Я вижу, что ты чувствуешь...",
+      "approach": "подтверждение"
+    },
+    {
+      "title": "Обучающий ответ", 
+      "text": "Давай поговорим о...",
+      "approach": "обучение"
+    },
+    {
+      "title": "Перенаправляющий ответ",
+      "text": "Как насчёт попробовать...",
+      "approach": "перенаправление"
+    }
+  ],
+  "explanation": "Ребенок, по-видимому, испытывает... потому что..."
+}"""
+
+_EMOTION_ANALYSIS_SYSTEM = [
+    {
+        "type": "text",
+        "text": _EMOTION_ANALYSIS_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+
 @dataclass
 class EmotionAnalysisRequest:
     """Request data for emotion analysis."""
@@ -42,7 +105,17 @@ class EmotionAnalysisResponse:
 class ClaudeService:
     """Service for interacting with Claude API for emotion analysis."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        request_bucket: Optional["TokenBucket"] = None,
+        request_semaphore: Optional[asyncio.Semaphore] = None
+    ):
+        # Shared throttle (e.g. the bot's) applied before every API call
+        self._request_bucket = request_bucket
+        # Shared cap on in-flight calls, taken only after the bucket admits the request
+        self._request_semaphore = request_semaphore
+        self._prompt_cache_miss_logged = False
+        
         # Log all proxy-related settings for debugging
         logger.info(f"Checking proxy configuration...")
         logger.info(f"ANTHROPIC_PROXY_URL from settings: {settings.anthropic.proxy_url}")
@@ -175,6 +248,10 @@ class ClaudeService:
             requests_per_day=settings.anthropic.requests_per_day
         )
     
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self._client.close()
+    
     async def analyze_child_emotions(
         self, 
         request: EmotionAnalysisRequest
@@ -195,24 +272,32 @@ class ClaudeService:
         start_time = time.time()
         
         try:
-            # Check rate limits
-            await self._rate_limiter.check_limits()
-            
             # Generate prompt
             prompt = self._build_emotion_analysis_prompt(request)
             
+            # Wait for the bucket before taking a concurrency slot, so waiting holds no slot
+            if self._request_bucket:
+                await self._request_bucket.acquire(estimated_tokens=settings.anthropic.estimated_request_tokens)
+            
+            # Check rate limits only once the request is about to be sent, so waiting can't fail it
+            await self._rate_limiter.check_limits()
+            
             # Call Claude API
-            response = await self._client.messages.create(
-                model=settings.anthropic.model,
-                max_tokens=settings.anthropic.max_tokens,
-                temperature=settings.anthropic.temperature,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            async with self._request_semaphore or nullcontext():
+                response = await self._client.messages.create(
+                    model=settings.anthropic.model,
+                    max_tokens=settings.anthropic.max_tokens,
+                    temperature=settings.anthropic.temperature,
+                    system=_EMOTION_ANALYSIS_SYSTEM,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ]
+                )
+            
+            self._log_prompt_cache_usage(response.usage)
             
             # Parse response
             analysis_result = self._parse_claude_response(response.content[0].text)
@@ -259,11 +344,23 @@ class ClaudeService:
                 service_name="Claude"
             )
     
+    def _log_prompt_cache_usage(self, usage) -> None:
+        """Log prompt cache writes and reads; note once if the system block is not being cached."""
+        cache_written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        logger.debug(
+            f"Claude usage: input={usage.input_tokens} cache_write={cache_written} "
+            f"cache_read={cache_read} output={usage.output_tokens}"
+        )
+        if not cache_written and not cache_read and not self._prompt_cache_miss_logged:
+            self._prompt_cache_miss_logged = True
+            logger.info(
+                "Emotion analysis system prompt was not cached; it may be below "
+                f"the minimum cacheable length for {settings.anthropic.model}"
+            )
+    
     def _build_emotion_analysis_prompt(self, request: EmotionAnalysisRequest) -> str:
-        """Build culturally-adapted prompt for Claude emotion analysis."""
-        
-        # Get cultural context for Russian audience
-        cultural_context = get_cultural_context(Language.RUSSIAN)
+        """Build the per-request user message; instructions live in _EMOTION_ANALYSIS_SYSTEM_PROMPT."""
         
         # Base context about the child in Russian
         child_context = f"""
@@ -286,60 +383,9 @@ class ClaudeService:
         if request.situation_context:
             situation = f"\nКонтекст ситуации: {request.situation_context}"
         
-        # Culturally-adapted prompt for Russian families
-        prompt = f"""Вы - эксперт по детской психологии и переводчик эмоций, работающий с российскими семьями. Ваша задача - помочь родителям понять эмоции своих детей и дать подходящие советы.
+        prompt = f"""{child_context}
 
-КУЛЬТУРНЫЙ КОНТЕКСТ:
-- Российский стиль воспитания: сочетание авторитетности и уважения
-- Умеренная прямота в общении
-- Практичные советы с эмпатией
-- Семейные ценности: смесь традиционных и современных подходов
-
-{child_context}
-
-Сообщение или поведение ребенка: "{request.child_message}"{situation}
-
-Пожалуйста, проанализируйте эмоциональное состояние этого ребенка и предоставьте:
-
-1. ОБНАРУЖЕННЫЕ ЭМОЦИИ: Перечислите основные эмоции (максимум 3)
-2. ОЦЕНКА УВЕРЕННОСТИ: От 0.1 до 1.0
-3. ТРИ ВАРИАНТА ОТВЕТА: Предоставьте ровно 3 разных способа реагирования:
-   - Краткий заголовок (5-10 слов)
-   - Текст ответа (соответствующий возрасту)
-   - Эмоциональный подход (подтверждающий, перенаправляющий, обучающий)
-
-4. ОБЪЯСНЕНИЕ: Краткое объяснение определенных эмоций
-
-Ответы должны быть:
-- Подходящими возрасту по языку и концепциям
-- Эмоционально поддерживающими
-- Практичными для родителей
-- Культурно приемлемыми для российских семей
-- Отражающими баланс авторитета и эмпатии
-
-Оформите свой ответ как JSON на русском языке:
-{{
-  "emotions": ["эмоция1", "эмоция2", "эмоция3"],
-  "confidence": 0.85,
-  "responses": [
-    {{
-      "title": "Подтверждающий ответ",
-      "text": "Я вижу, что ты чувствуешь...",
-      "approach": "подтверждение"
-    }},
-    {{
-      "title": "Обучающий ответ", 
-      "text": "Давай поговорим о...",
-      "approach": "обучение"
-    }},
-    {{
-      "title": "Перенаправляющий ответ",
-      "text": "Как насчёт попробовать...",
-      "approach": "перенаправление"
-    }}
-  ],
-  "explanation": "Ребенок, по-видимому, испытывает... потому что..."
-}}"""
+Сообщение или поведение ребенка: "{request.child_message}"{situation}"""
         
         return prompt
     
@@ -394,6 +440,45 @@ class ClaudeService:
                 service_name="Claude"
             )
     
+    def _parse_weekly_report_response(self, response_text: str) -> Dict[str, Any]:
+        """Parse Claude's JSON weekly report (the schema requested by _weekly_report_params)."""
+        try:
+            import json
+            
+            # Find JSON in response (Claude might add extra text)
+            start_idx = response_text.find('{')
+            end_idx = response_text.rfind('}') + 1
+            
+            if start_idx == -1 or end_idx == 0:
+                raise ValueError("No JSON found in Claude response")
+            
+            parsed = json.loads(response_text[start_idx:end_idx])
+            
+            # Validate required fields
+            for field in ('summary', 'trends', 'insights', 'recommendations', 'highlights'):
+                if field not in parsed:
+                    raise ValueError(f"Missing required field: {field}")
+            
+            if not isinstance(parsed['recommendations'], list):
+                raise ValueError("Recommendations must be a list")
+            
+            return parsed
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse Claude weekly report JSON: {e}")
+            logger.error(f"Response text: {response_text}")
+            raise ExternalServiceError(
+                "Invalid JSON weekly report from Claude API",
+                service_name="Claude"
+            )
+        
+        except ValueError as e:
+            logger.error(f"Invalid Claude weekly report structure: {e}")
+            raise ExternalServiceError(
+                f"Invalid weekly report structure: {str(e)}",
+                service_name="Claude"
+            )
+    
     async def generate_weekly_report(
         self,
         child_name: str,
@@ -402,7 +487,7 @@ class ClaudeService:
         checkin_data: List[Dict],
         period_start: str,
         period_end: str
-    ) -> Dict[str, str]:
+    ) -> Dict[str, Any]:
         """
         Generate a weekly emotional development report.
         
@@ -420,11 +505,104 @@ class ClaudeService:
         try:
             await self._rate_limiter.check_limits()
             
-            # Build summary data
-            emotion_summary = self._summarize_emotions(emotion_data)
-            checkin_summary = self._summarize_checkins(checkin_data)
+            response = await self._client.messages.create(
+                **self._weekly_report_params(
+                    child_name, child_age, emotion_data, checkin_data, period_start, period_end
+                )
+            )
+            
+            return self._parse_weekly_report_response(response.content[0].text)
+            
+        except Exception as e:
+            logger.error(f"Failed to generate weekly report: {e}")
+            raise ExternalServiceError(
+                f"Failed to generate weekly report: {str(e)}",
+                service_name="Claude"
+            )
+    
+    async def submit_weekly_report_batch(self, report_requests: Dict[str, Dict]) -> str:
+        """
+        Queue several weekly reports as one Message Batch (billed at half price).
+        
+        Args:
+            report_requests: generate_weekly_report keyword arguments keyed by a
+                caller-chosen id (up to 64 letters, digits, "-" or "_"; a child id fits)
+            
+        Returns:
+            Batch id to pass to collect_weekly_report_batch
+        """
+        try:
+            batch = await self._client.messages.batches.create(
+                requests=[
+                    {"custom_id": custom_id, "params": self._weekly_report_params(**kwargs)}
+                    for custom_id, kwargs in report_requests.items()
+                ]
+            )
+            logger.info(f"Submitted weekly report batch {batch.id} with {len(report_requests)} reports")
+            return batch.id
+            
+        except Exception as e:
+            logger.error(f"Failed to submit weekly report batch: {e}")
+            raise ExternalServiceError(
+                f"Failed to submit weekly report batch: {str(e)}",
+                service_name="Claude"
+            )
+    
+    async def collect_weekly_report_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0,
+        max_poll_interval: float = 600.0
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Wait for a weekly report batch to finish and parse its reports.
+        
+        Polls with exponential backoff. Reports that errored or expired are left
+        out, so callers can fall back to generate_weekly_report for those ids.
+        """
+        try:
+            while True:
+                batch = await self._client.messages.batches.retrieve(batch_id)
+                if batch.processing_status == "ended":
+                    break
+                await asyncio.sleep(poll_interval)
+                poll_interval = min(poll_interval * 2, max_poll_interval)
+            
+            reports = {}
+            async for entry in await self._client.messages.batches.results(batch_id):
+                if entry.result.type != "succeeded":
+                    logger.warning(f"Weekly report {entry.custom_id} in batch {batch_id} {entry.result.type}")
+                    continue
+                try:
+                    reports[entry.custom_id] = self._parse_weekly_report_response(
+                        entry.result.message.content[0].text
+                    )
+                except ExternalServiceError as e:
+                    logger.warning(f"Unparseable weekly report {entry.custom_id}: {e}")
+            return reports
             
-            prompt = f"""Составьте подробный еженедельный отчёт об эмоциональном развитии ребёнка для российской семьи.
+        except Exception as e:
+            logger.error(f"Failed to collect weekly report batch {batch_id}: {e}")
+            raise ExternalServiceError(
+                f"Failed to collect weekly report batch: {str(e)}",
+                service_name="Claude"
+            )
+    
+    def _weekly_report_params(
+        self,
+        child_name: str,
+        child_age: int,
+        emotion_data: List[Dict],
+        checkin_data: List[Dict],
+        period_start: str,
+        period_end: str
+    ) -> Dict:
+        """Messages API parameters for a weekly report, shared by direct and batch calls."""
+        # Build summary data
+        emotion_summary = self._summarize_emotions(emotion_data)
+        checkin_summary = self._summarize_checkins(checkin_data)
+        
+        prompt = f"""Составьте подробный еженедельный отчёт об эмоциональном развитии ребёнка для российской семьи.
 
 Информация о ребёнке:
 - Имя: {child_name}
@@ -460,22 +638,13 @@ class ClaudeService:
   "recommendations": ["Рекомендация 1", "Рекомендация 2", ...],
   "highlights": "Положительные моменты..."
 }}"""
-            
-            response = await self._client.messages.create(
-                model=settings.anthropic.model,
-                max_tokens=1500,
-                temperature=0.3,  # Lower temperature for more consistent reports
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            return self._parse_claude_response(response.content[0].text)
-            
-        except Exception as e:
-            logger.error(f"Failed to generate weekly report: {e}")
-            raise ExternalServiceError(
-                f"Failed to generate weekly report: {str(e)}",
-                service_name="Claude"
-            )
+        
+        return {
+            "model": settings.anthropic.model,
+            "max_tokens": 1500,
+            "temperature": 0.3,  # Lower temperature for more consistent reports
+            "messages": [{"role": "user", "content": prompt}],
+        }
     
     def _summarize_emotions(self, emotion_data: List[Dict]) -> str:
         """Summarize emotion data for report generation."""
@@ -563,4 +732,44 @@ class RateLimiter:
         
         # Record this request
         self.minute_requests.append(now)
-        self.daily_requests.append(now)
\ No newline at end of file
+        self.daily_requests.append(now)
+
+
+class TokenBucket:
+    """
+    Async token bucket that smooths bursts to a per-minute request (and token) budget.
+    
+    Unlike RateLimiter, callers wait for capacity instead of failing, so a burst is
+    spread out rather than turned into 429s and retries.
+    """
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: Optional[int] = None):
+        self._request_capacity = float(requests_per_minute)
+        self._token_capacity = float(tokens_per_minute) if tokens_per_minute else None
+        self._requests = self._request_capacity
+        self._tokens = self._token_capacity or 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed_minutes = (now - self._updated) / 60
+        self._updated = now
+        self._requests = min(self._request_capacity, self._requests + elapsed_minutes * self._request_capacity)
+        if self._token_capacity:
+            self._tokens = min(self._token_capacity, self._tokens + elapsed_minutes * self._token_capacity)
+    
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait until one request (and `estimated_tokens`) fits in the budget, then spend it."""
+        async with self._lock:
+            tokens = min(float(estimated_tokens), self._token_capacity) if self._token_capacity else 0.0
+            while True:
+                self._refill()
+                wait = max(0.0, (1 - self._requests) / self._request_capacity * 60)
+                if self._token_capacity:
+                    wait = max(wait, (tokens - self._tokens) / self._token_capacity * 60)
+                if wait <= 0:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep(wait)
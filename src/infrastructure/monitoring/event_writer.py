@@ -0,0 +1,143 @@
+"""Batched writer for usage analytics events."""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import insert
+
+from ...core.models.analytics import UsageAnalytics
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop(); the flusher writes everything ahead of it, then exits
+_STOP = object()
+
+
+class UsageEventWriter:
+    """
+    Queue usage events in memory and persist them with multi-row INSERTs.
+    
+    Exposes the same ``track_event`` call the bot and services already use, but
+    returns as soon as the event is queued; a background task flushes the queue
+    every ``flush_interval`` seconds or once ``max_batch`` events are waiting.
+    """
+    
+    def __init__(
+        self,
+        db_manager,
+        max_batch: int = 64,
+        flush_interval: float = 0.2,
+        max_queue: int = 10000
+    ):
+        self._db_manager = db_manager
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._flusher: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the background flusher."""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+            logger.info("Usage event writer started")
+    
+    async def stop(self, timeout: float = 10.0):
+        """Let the flusher write its current batch and exit, then persist whatever is still queued."""
+        if self._flusher:
+            if not self._flusher.done():
+                await self._queue.put(_STOP)
+                try:
+                    await asyncio.wait_for(asyncio.shield(self._flusher), timeout)
+                except asyncio.TimeoutError:
+                    # Fallback only: a write stuck past the timeout loses its in-flight batch
+                    logger.warning(f"Usage event flusher did not stop within {timeout}s, cancelling")
+                    self._flusher.cancel()
+                    try:
+                        await self._flusher
+                    except asyncio.CancelledError:
+                        pass
+            self._flusher = None
+        
+        while not self._queue.empty():
+            await self._write_batch(self._drain(self._max_batch))
+        logger.info("Usage event writer stopped")
+    
+    async def track_event(
+        self,
+        event_type: str,
+        user_id: Optional[UUID] = None,
+        user_telegram_id: Optional[int] = None,
+        event_data: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        response_time_ms: Optional[int] = None,
+        error_code: Optional[str] = None,
+        error_message: Optional[str] = None
+    ):
+        """Queue a usage event; never blocks on the database."""
+        row = {
+            "event_type": getattr(event_type, "value", event_type),
+            "event_date": date.today(),
+            "event_data": event_data,
+            "session_id": session_id,
+            "user_id": user_id,
+            "user_telegram_id": user_telegram_id,
+            "platform": "telegram",
+            "response_time_ms": response_time_ms,
+            "error_code": error_code,
+            "error_message": error_message[:500] if error_message else None,
+        }
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            logger.warning(f"Usage event queue full, dropping {row['event_type']} event")
+    
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        """Take up to ``limit`` queued events without waiting."""
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not _STOP:
+                batch.append(row)
+        return batch
+    
+    async def _flush_loop(self):
+        """Collect events into batches and write them."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+            batch = [row]
+            deadline = loop.time() + self._flush_interval
+            
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            
+            await self._write_batch(batch)
+    
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Persist a batch of events with a single multi-row INSERT."""
+        if not batch:
+            return
+        
+        try:
+            async with self._db_manager.get_session() as session:
+                await session.execute(insert(UsageAnalytics), batch)
+                await session.commit()
+            logger.debug("Wrote %d usage events", len(batch))
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} usage events: {e}")
@@ -1,24 +1,129 @@
 """Main Telegram Bot class for Family Emotions App."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Optional
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple
 from uuid import uuid4
 
-from telegram.ext import Application, ContextTypes
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from telegram.ext import AIORateLimiter, Application, BaseUpdateProcessor, ContextTypes
+from telegram.request import HTTPXRequest
 from telegram import Bot, Update
 
 from .states import ConversationStates, UserContext
 from ...core.config import settings
-from ...core.services import UserService, FamilyService, AnalyticsService
-from ...infrastructure.external import EmotionService
+from ...core.services import UserService, FamilyService, AnalyticsService, ReportService
+from ...infrastructure.external import ClaudeService, EmotionService, TokenBucket
 
 logger = logging.getLogger(__name__)
 
 
+class _OrjsonRequest(HTTPXRequest):
+    """HTTPX transport that decodes Bot API responses with orjson."""
+    
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> Dict[str, Any]:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # Let the stock decoder produce PTB's usual "Invalid server response" error
+            return HTTPXRequest.parse_json_payload(payload)
+
+
+class _PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Process updates concurrently across users but strictly in order for each user.
+    
+    Conversation state lives in one UserContext per user, and handlers only advance it after
+    several awaits, so two updates from the same user must never interleave.
+    """
+    
+    # PTB takes a global concurrency slot before do_process_update, so every update queued on
+    # a user's lock holds one; updates beyond this many per user are dropped instead of waiting
+    MAX_PENDING_PER_USER = 3
+    
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        # Per-user lock and the number of updates holding or waiting on it
+        self._user_locks: Dict[int, Tuple[asyncio.Lock, int]] = {}
+    
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = None
+        if isinstance(update, Update):
+            if update.effective_user:
+                key = update.effective_user.id
+            elif update.effective_chat:
+                key = update.effective_chat.id
+        if key is None:
+            await coroutine
+            return
+        
+        lock, users = self._user_locks.get(key, (None, 0))
+        if users >= self.MAX_PENDING_PER_USER:
+            await self._drop_update(update, coroutine, key)
+            return
+        if lock is None:
+            lock = asyncio.Lock()
+        self._user_locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                await coroutine
+        finally:
+            lock, users = self._user_locks[key]
+            if users == 1:
+                del self._user_locks[key]
+            else:
+                self._user_locks[key] = (lock, users - 1)
+    
+    @staticmethod
+    async def _drop_update(update: Update, coroutine: Awaitable[Any], key: int) -> None:
+        """Discard an update from a user who already has a full queue."""
+        if asyncio.iscoroutine(coroutine):
+            coroutine.close()
+        logger.debug(f"Dropping update {update.update_id} from {key}: too many pending updates")
+        
+        # Stop the button's loading spinner; the press itself is ignored
+        if update.callback_query:
+            try:
+                await update.callback_query.answer()
+            except Exception as e:
+                logger.debug(f"Could not answer dropped callback query: {e}")
+    
+    async def initialize(self) -> None:
+        pass
+    
+    async def shutdown(self) -> None:
+        pass
+
+
+@dataclass
+class SessionServices:
+    """Core services bound to one database session."""
+    session: AsyncSession
+    user: UserService
+    family: FamilyService
+    report: ReportService
+
+
 class FamilyEmotionsBot:
     """Main bot class that coordinates all bot functionality."""
     
+    # Upper bound on remembered message renders used to skip no-op edits
+    MAX_TRACKED_RENDERS = 10000
+    
+    # Upper bound on memoized quick-translate responses
+    MAX_CACHED_TRANSLATIONS = 512
+    
+    # Upper bound on memoized child profile renders
+    MAX_CACHED_PROFILES = 256
+    
     def __init__(
         self,
         user_service: Optional[UserService] = None,
@@ -31,26 +136,253 @@ class FamilyEmotionsBot:
         self.emotion_service = emotion_service
         self.analytics_service = analytics_service
         
-        # User conversation contexts
-        self.user_contexts: Dict[int, UserContext] = {}
+        # User conversation contexts, least recently used first
+        self.user_contexts: OrderedDict[int, UserContext] = OrderedDict()
+        
+        # (rendered text hash, keyboard hash, resulting message hash) per (chat_id, message_id)
+        self._last_render: OrderedDict[Tuple[int, int], Tuple[int, int, int]] = OrderedDict()
+        
+        # Recently loaded users by telegram_id as (user, monotonic load time)
+        self._user_cache: OrderedDict[int, Tuple[Any, float]] = OrderedDict()
+        
+        # Fire-and-forget tasks (analytics etc.), kept referenced until done
+        self._background_tasks: Set[asyncio.Task] = set()
+        
+        # Per-chat FIFO of slow jobs; a queue exists only while its worker is draining it
+        self._chat_queues: Dict[int, asyncio.Queue] = {}
+        
+        # Latest debounced job per key, still waiting out its delay
+        self._debounced: Dict[Any, asyncio.Task] = {}
         
         # Database manager (injected by main app)
         self.db_manager = None
         
+        # Redis-backed CacheService (injected by main app when caching is enabled)
+        self.cache_service = None
+        
+        # Shared Claude client, created on first use so startup works without an API key
+        self._anthropic_client = None
+        
+        # Shared ClaudeService for emotion analysis; building one probes proxies and opens a pool
+        self._claude_service: Optional[ClaudeService] = None
+        
+        # Caps in-flight Claude calls so slow responses can't tie up every update worker
+        self.claude_semaphore = asyncio.Semaphore(settings.anthropic.max_concurrent_requests)
+        
+        # Spreads Claude calls over the per-minute request/token budget
+        self.claude_bucket = TokenBucket(
+            requests_per_minute=settings.anthropic.requests_per_minute,
+            tokens_per_minute=settings.anthropic.tokens_per_minute
+        )
+        
+        # Claude quick-translate responses keyed by normalized situation text, LRU order
+        self._translation_cache: OrderedDict[str, str] = OrderedDict()
+        
+        # Rendered child profiles keyed by (child id, updated_at), LRU order
+        self._profile_cache: OrderedDict[Tuple[Any, Any], str] = OrderedDict()
+        
         # Create application
-        self.application = Application.builder().token(settings.telegram.bot_token).build()
+        self.application = build_application()
         
         # Setup handlers will be called from setup_handlers function
         
+    @property
+    def anthropic_client(self):
+        """AsyncAnthropic client reused across requests to keep its connection pool warm."""
+        if self._anthropic_client is None:
+            from anthropic import AsyncAnthropic
+            
+            api_key = settings.anthropic.claude_api_key
+            if api_key:
+                masked_key = api_key[:10] + "***" + api_key[-4:] if len(api_key) > 14 else "***MASKED***"
+                logger.info(f"Creating Claude client with key {masked_key}, model {settings.anthropic.model}")
+            else:
+                logger.error("Claude API key is None or empty!")
+            
+            self._anthropic_client = AsyncAnthropic(api_key=api_key, max_retries=2)
+        return self._anthropic_client
+    
+    @property
+    def claude_service(self) -> ClaudeService:
+        """ClaudeService reused across requests so its HTTP connections stay alive."""
+        if self._claude_service is None:
+            self._claude_service = ClaudeService(
+                request_bucket=self.claude_bucket,
+                request_semaphore=self.claude_semaphore
+            )
+        return self._claude_service
+    
+    async def shutdown(self, timeout: float = 30.0):
+        """
+        Let queued chat jobs and background tasks finish, then cancel what is left.
+        
+        Chat queue workers are background tasks themselves, so waiting on those drains
+        the queues too. Call before close_clients() so running jobs keep their clients.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        # Finishing tasks may schedule more (e.g. analytics), so wait until none remain
+        while self._background_tasks:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await asyncio.wait(set(self._background_tasks), timeout=remaining)
+        
+        if self._background_tasks:
+            logger.warning(f"Cancelling {len(self._background_tasks)} background tasks still running after {timeout}s")
+            # Jobs still queued behind a cancelled worker never started; close them unawaited
+            queues = list(self._chat_queues.values())
+            pending = list(self._background_tasks)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for queue in queues:
+                while not queue.empty():
+                    job = queue.get_nowait()
+                    if asyncio.iscoroutine(job):
+                        job.close()
+            self._chat_queues.clear()
+    
+    async def close_clients(self):
+        """Close the shared Claude HTTP clients."""
+        if self._claude_service is not None:
+            await self._claude_service.close()
+            self._claude_service = None
+        if self._anthropic_client is not None:
+            await self._anthropic_client.close()
+            self._anthropic_client = None
+    
+    @asynccontextmanager
+    async def services(self) -> AsyncIterator[SessionServices]:
+        """Open a database session and yield the core services bound to it."""
+        async with self.db_manager.get_session() as session:
+            yield SessionServices(
+                session=session,
+                user=UserService(session),
+                family=FamilyService(session),
+                report=ReportService(session)
+            )
+    
+    @staticmethod
+    def translation_cache_key(message_text: str) -> str:
+        """Hash the full normalized situation so retries differing only in case/spacing share an entry."""
+        normalized = " ".join(message_text.lower().split())
+        return hashlib.sha256(normalized.encode()).hexdigest()
+    
+    def get_cached_translation(self, key: str) -> Optional[str]:
+        """Return a memoized Claude response for a normalized situation, if any."""
+        text = self._translation_cache.get(key)
+        if text is not None:
+            self._translation_cache.move_to_end(key)
+        return text
+    
+    def cache_translation(self, key: str, text: str):
+        """Memoize a Claude response, evicting the least recently used beyond MAX_CACHED_TRANSLATIONS."""
+        self._translation_cache[key] = text
+        self._translation_cache.move_to_end(key)
+        if len(self._translation_cache) > self.MAX_CACHED_TRANSLATIONS:
+            self._translation_cache.popitem(last=False)
+    
     def get_user_context(self, user_id: int):
         """Get or create user context for conversation state management."""
-        if user_id not in self.user_contexts:
-            from .states import UserContext
+        now = time.monotonic()
+        self._evict_idle_contexts(now)
+        
+        context = self.user_contexts.get(user_id)
+        if context is None:
             context = UserContext()
             context.session_id = str(uuid4())
             self.user_contexts[user_id] = context
+            if len(self.user_contexts) > settings.telegram.user_context_max:
+                self.user_contexts.popitem(last=False)
+        else:
+            self.user_contexts.move_to_end(user_id)
+        
+        context.last_active = now
+        return context
+    
+    def _evict_idle_contexts(self, now: float):
+        """Drop conversation contexts that have been idle longer than the configured TTL."""
+        ttl = settings.telegram.user_context_ttl
+        # Contexts are kept in access order, so idle ones sit at the front
+        while self.user_contexts:
+            oldest = next(iter(self.user_contexts.values()))
+            if now - oldest.last_active <= ttl:
+                break
+            self.user_contexts.popitem(last=False)
+    
+    @staticmethod
+    def _message_fingerprint(message) -> int:
+        """Hash of what a Telegram message currently displays."""
+        return hash((message.text, str(message.reply_markup)))
+    
+    def render_state(self, message, text: str, reply_markup=None) -> Tuple[bool, bool]:
+        """
+        Compare new content with what we last rendered into a message.
         
-        return self.user_contexts[user_id]
+        Returns:
+            (text unchanged, keyboard unchanged); both False if the message was
+            edited elsewhere since our last render or was never tracked
+        """
+        entry = self._last_render.get((message.chat_id, message.message_id))
+        if entry is None or entry[2] != self._message_fingerprint(message):
+            return False, False
+        return entry[0] == hash(text), entry[1] == hash(str(reply_markup))
+    
+    def remember_render(self, message, text: str, reply_markup=None):
+        """Record the content rendered into a message, bounded by MAX_TRACKED_RENDERS."""
+        key = (message.chat_id, message.message_id)
+        self._last_render[key] = (hash(text), hash(str(reply_markup)), self._message_fingerprint(message))
+        self._last_render.move_to_end(key)
+        if len(self._last_render) > self.MAX_TRACKED_RENDERS:
+            self._last_render.popitem(last=False)
+    
+    def run_in_background(self, coro: Awaitable) -> asyncio.Task:
+        """Schedule a coroutine without awaiting it, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+        return task
+    
+    def _on_background_task_done(self, task: asyncio.Task):
+        """Release a finished background task and log its failure, if any."""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Background task failed: {task.exception()}")
+    
+    def submit_chat_job(self, chat_id: int, job: Awaitable):
+        """Run a slow job after earlier jobs from the same chat; other chats proceed in parallel."""
+        queue = self._chat_queues.get(chat_id)
+        if queue is None:
+            queue = self._chat_queues[chat_id] = asyncio.Queue()
+            self.run_in_background(self._drain_chat_queue(chat_id, queue))
+        queue.put_nowait(job)
+    
+    def debounce(self, key: Any, job_factory: Callable[[], Awaitable], delay: float):
+        """Run job_factory() after delay seconds unless a newer job for the same key replaces it first."""
+        pending = self._debounced.pop(key, None)
+        if pending is not None:
+            pending.cancel()
+        self._debounced[key] = self.run_in_background(self._run_debounced(key, job_factory, delay))
+    
+    async def _run_debounced(self, key: Any, job_factory: Callable[[], Awaitable], delay: float):
+        """Wait out the debounce window, then run the job; once started it is never cancelled."""
+        await asyncio.sleep(delay)
+        if self._debounced.get(key) is asyncio.current_task():
+            del self._debounced[key]
+        await job_factory()
+    
+    async def _drain_chat_queue(self, chat_id: int, queue: asyncio.Queue):
+        """Await a chat's queued jobs in order, then retire the queue."""
+        try:
+            while not queue.empty():
+                job = queue.get_nowait()
+                try:
+                    await job
+                except Exception as e:
+                    logger.error(f"Chat job failed for chat {chat_id}: {e}")
+        finally:
+            self._chat_queues.pop(chat_id, None)
     
     def clear_user_context(self, user_id: int):
         """Clear user context (e.g., on /start or error)."""
@@ -81,6 +413,12 @@ class FamilyEmotionsBot:
             
             if not self.db_manager:
                 return None
+            
+            # Rapid successive updates from the same user reuse the recently loaded row
+            now = time.monotonic()
+            cached = self._user_cache.get(telegram_user.id)
+            if cached and now - cached[1] < settings.telegram.user_cache_ttl:
+                return cached[0], False
                 
             # Use context manager to ensure session cleanup
             async with self.db_manager.get_session() as session:
@@ -93,6 +431,7 @@ class FamilyEmotionsBot:
                 if user:
                     # Make sure relationships are loaded
                     await session.refresh(user)
+                    self._cache_user(telegram_user.id, user, now)
                     return user, False
                 
                 # Create new user
@@ -118,12 +457,24 @@ class FamilyEmotionsBot:
                     )
                 
                 logger.info(f"Created new user: {user.id} (Telegram ID: {telegram_user.id})")
+                self._cache_user(telegram_user.id, user, now)
                 return user, True
             
         except Exception as e:
             logger.error(f"Error getting/creating user: {e}")
             return None
     
+    def _cache_user(self, telegram_id: int, user, now: float):
+        """Remember a loaded user, bounded like the conversation contexts."""
+        self._user_cache[telegram_id] = (user, now)
+        self._user_cache.move_to_end(telegram_id)
+        if len(self._user_cache) > settings.telegram.user_context_max:
+            self._user_cache.popitem(last=False)
+    
+    def forget_user(self, telegram_id: int):
+        """Drop a cached user so the next update re-reads it (call after changing its family)."""
+        self._user_cache.pop(telegram_id, None)
+    
     async def send_typing_action(self, context: ContextTypes.DEFAULT_TYPE):
         """Send typing action to show bot is working."""
         try:
@@ -219,6 +570,14 @@ Use the menu below to continue 👇
         child_name: str = "your child"
     ) -> str:
         """Format emotion translation results for display."""
+        return self.format_emotion_translation_result_sync(translation, child_name)
+    
+    def format_emotion_translation_result_sync(
+        self,
+        translation,
+        child_name: str = "your child"
+    ) -> str:
+        """Format emotion translation results without awaiting; cheap enough to run on the loop."""
         if not translation.translated_emotions:
             from ...core.localization.translator import _
             return f"❌ <b>{_('emotion_translation.limits.translation_failed')}</b>\n\n{_('emotion_translation.limits.translation_failed_description')}"
@@ -226,7 +585,7 @@ Use the menu below to continue 👇
         emotions_text = ", ".join(translation.translated_emotions)
         confidence_text = f"{translation.confidence_score * 100:.0f}%"
         
-        result = f"""
+        parts = [f"""
 🎯 <b>Emotion Analysis Complete</b>
 
 👶 <b>Child:</b> {child_name}
@@ -234,19 +593,27 @@ Use the menu below to continue 👇
 📊 <b>Confidence:</b> {confidence_text}
 
 💡 <b>Suggested Responses:</b>
-"""
+"""]
         
         for i, response in enumerate(translation.response_options, 1):
-            result += f"\n<b>{i}. {response['title']}</b>\n"
-            result += f"<i>{response['text']}</i>\n"
-            result += f"<code>Approach: {response['approach']}</code>\n"
+            parts.append(
+                f"\n<b>{i}. {response['title']}</b>\n"
+                f"<i>{response['text']}</i>\n"
+                f"<code>Approach: {response['approach']}</code>\n"
+            )
         
-        result += f"\n⏱️ <i>Processed in {translation.processing_time_ms}ms</i>"
+        parts.append(f"\n⏱️ <i>Processed in {translation.processing_time_ms}ms</i>")
         
-        return result
+        return "".join(parts)
     
     async def format_child_profile(self, child) -> str:
-        """Format child profile information."""
+        """Format child profile information, reusing the render until the child is updated."""
+        key = (child.id, child.updated_at)
+        profile = self._profile_cache.get(key)
+        if profile is not None:
+            self._profile_cache.move_to_end(key)
+            return profile
+        
         profile = f"""
 👶 <b>{child.name}</b>
 
@@ -270,6 +637,9 @@ Use the menu below to continue 👇
         
         profile += f"\n📊 <b>Profile created:</b> {child.created_at.strftime('%B %d, %Y')}"
         
+        self._profile_cache[key] = profile
+        if len(self._profile_cache) > self.MAX_CACHED_PROFILES:
+            self._profile_cache.popitem(last=False)
         return profile
     
     async def format_usage_stats(self, user) -> str:
@@ -338,11 +708,31 @@ def create_bot(emotion_analyzer) -> Application:
     logger.warning("Creating bot with temporary service instances - implement proper DI")
     
     # Create bot application
-    application = Application.builder().token(settings.telegram.bot_token).build()
+    application = build_application()
     
     return application
 
 
+def build_application() -> Application:
+    """
+    Build the Telegram application.
+    
+    Updates from different users run concurrently so a slow Claude call never stalls polling,
+    but each user's updates run one at a time so their conversation state stays consistent.
+    Outbound Bot API calls are throttled to Telegram's limits so bursts wait instead of hitting 429s.
+    Every Bot API response is decoded with orjson.
+    """
+    return (
+        Application.builder()
+        .token(settings.telegram.bot_token)
+        .concurrent_updates(_PerUserUpdateProcessor(settings.telegram.concurrent_updates))
+        .request(_OrjsonRequest(connection_pool_size=settings.telegram.connection_pool_size))
+        .get_updates_request(_OrjsonRequest())
+        .rate_limiter(AIORateLimiter(max_retries=settings.telegram.rate_limit_retries))
+        .build()
+    )
+
+
 def setup_bot_commands(application: Application, bot_instance=None):
     """Setup bot commands and handlers."""
     from .handlers import setup_handlers
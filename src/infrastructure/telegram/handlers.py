@@ -2,10 +2,19 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
-from uuid import UUID
-
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+import re
+from collections import Counter
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from string import Template
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, desc, func, select
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from telegram.error import BadRequest
 from telegram.ext import (
     ContextTypes, 
     CommandHandler, 
@@ -16,38 +25,415 @@ from telegram.ext import (
 
 from .keyboards import InlineKeyboards
 from .states import ConversationStates
+from ...core.config import settings
 from ...core.exceptions import (
     RateLimitExceededError
 )
-from ...core.localization import _, Language, set_language
+from ...core.localization import _, Language, get_language, set_language
+from ...core.models.emotion import EmotionTranslation, TranslationStatus
+from ...core.models.user import UserRole
+from ...core.services import FamilyService, ReportService, UserService
+from ...core.services.report_service import WEEKLY_REPORT_ERROR_HTML, report_week_start
+from ..external.claude_service import EmotionAnalysisRequest, EmotionAnalysisResponse
 
 logger = logging.getLogger(__name__)
 
+class _ErrorSampler:
+    """Decide which errors get a full traceback: the first of each type, then one in every `rate`."""
+    
+    def __init__(self, rate: int = 100):
+        self._rate = rate
+        self._seen: Counter = Counter()
+    
+    def should_trace(self, exc_type: type) -> bool:
+        count = self._seen[exc_type]
+        self._seen[exc_type] = count + 1
+        return count % self._rate == 0
+
+
+_error_sampler = _ErrorSampler()
+
+# Emoji shown next to adult family members in the family list
+ROLE_EMOJI = {
+    "parent": "👨‍👩‍👧‍👦",
+}
+DEFAULT_ROLE_EMOJI = "🧑‍🍼"
+
+# Replies that mean "skip this optional step"
+_SKIP_TOKENS = frozenset({"skip", "Skip", "SKIP", "/skip"})
+
+# Shared "back to family management" button for member selection keyboards
+_BACK_TO_MANAGE_FAMILY = InlineKeyboardButton("🔙 Назад", callback_data="manage_family")
+
+# Shared "back to child management" button for child selection keyboards
+_BACK_TO_MANAGE_CHILDREN = InlineKeyboardButton("🔙 Назад", callback_data="manage_children")
+
+# Message templates for screens whose layout never changes
+_SETTINGS_TEMPLATE = Template("""
+⚙️ <b>Settings</b>
+
+<b>Account:</b> $first_name
+<b>Language:</b> $language
+<b>Subscription:</b> $subscription
+<b>Daily Usage:</b> $daily_used/$daily_limit
+
+What would you like to configure? 👇
+""")
+
+_REPORTS_MENU_TEXT = """
+📊 <b>Weekly Reports</b>
+
+View comprehensive emotional development reports for your children.
+
+Choose a timeframe or child below 👇
+"""
+
+_HELP_MENU_TEXT = """
+❓ <b>Help & Support</b>
+
+Get help with using the Family Emotions App and understanding your child's emotional development.
+
+What do you need help with? 👇
+"""
+
+# Child pickers opened before any child was added
+_NO_CHILDREN_TO_EDIT_HTML = (
+    "👶 <b>Редактирование профиля ребенка</b>\n\n"
+    "У вас пока нет детей для редактирования.\n\n"
+    "Добавьте ребенка сначала."
+)
+_NO_CHILDREN_TO_REMOVE_HTML = "👶 <b>Удалить профиль ребенка</b>\n\nУ вас пока нет детей для удаления."
+
+# Report screen shown while the database is unavailable
+_REPORT_UNAVAILABLE_TEMPLATE = Template("""
+📊 <b>$title</b>
+
+❌ <b>Сервис временно недоступен</b>
+
+К сожалению, сейчас не удается сгенерировать отчет из-за проблем с базой данных.
+
+Попробуйте позже.
+
+<i>Для генерации отчетов нужны данные об анализе эмоций.</i>
+""")
+
+_REMOVE_CHILD_CONFIRM_TEMPLATE = Template(
+    "⚠️ <b>Подтвердите удаление</b>\n\n"
+    "Вы действительно хотите удалить профиль <b>$name</b>?\n\n"
+    "<b>Это действие:</b>\n"
+    "• Удалит профиль ребенка навсегда\n"
+    "• Удалит все анализы эмоций для $name\n"
+    "• Удалит все отчеты для $name\n\n"
+    "<b>Восстановление будет невозможно!</b>"
+)
+
+_CHILD_REMOVED_TEMPLATE = Template(
+    "✅ <b>Профиль удален</b>\n\n"
+    "Профиль <b>$name</b> и все связанные данные успешно удалены.\n\n"
+    "Что хотите сделать дальше?"
+)
+
+# Add-child wizard prompts; only the child's name varies between renders
+_ADD_CHILD_NAME_PROMPT = """
+👶 <b>Add New Child</b>
+
+What is your child's name?
+
+<i>Type the name below:</i>
+"""
+
+_ADD_CHILD_INTERESTS_TEMPLATE = Template("""
+👶 <b>Adding $name</b>
+
+What are $name's main interests and hobbies? This helps me suggest more relevant responses.
+
+For example:
+• "Loves dinosaurs, drawing, and video games"
+• "Enjoys dancing, music, and playing with dolls"
+• "Interested in sports, especially soccer and basketball"
+
+<i>List their interests below, or type "skip" to continue:</i>
+""")
+
+_ADD_CHILD_SPECIAL_NEEDS_TEMPLATE = Template("""
+👶 <b>Adding $name</b>
+
+Are there any special considerations I should know about $name? This could include:
+
+• Learning differences or challenges
+• Medical conditions that affect behavior
+• Therapy or treatment programs
+• Communication preferences
+• Sensory sensitivities
+
+<i>Add special considerations below, or type "skip" to finish:</i>
+""")
+
+_ADD_CHILD_SUCCESS_TEMPLATE = Template("""
+✅ <b>Child Added Successfully!</b>
+
+$child_profile
+
+$name has been added to your family profile. You can now get personalized emotion translations and analysis!
+
+What would you like to do next? 👇
+""")
+
+_ANALYZING_HTML = "🔄 <b>Analyzing emotions...</b>\n\nThis may take a few seconds."
+
+_RATE_LIMIT_HTML = (
+    "⏳ <b>Daily limit reached</b>\n\n"
+    "You've used all your daily translations. Upgrade to Premium for more requests!"
+)
+
+# Quick-translate prompt, split around the parent's situation text
+_EMOTION_PROMPT_PREFIX = """You are an expert child psychologist helping parents understand their child's emotions. 
+
+Analyze this situation and provide:
+1. What emotions the child is likely experiencing
+2. Possible reasons behind these emotions
+3. 3 specific, age-appropriate response suggestions
+
+Situation: \""""
+_EMOTION_PROMPT_SUFFIX = """\"
+
+Respond in this format:
+**Emotions detected:** [list emotions]
+**Possible reasons:** [brief explanation]
+**Suggested responses:**
+1. [First response approach]
+2. [Second response approach] 
+3. [Third response approach]
+
+Keep responses practical, empathetic, and focused on connection with the child."""
+
+_FAMILY_ADD_TEMPLATE = Template("""
+➕ <b>Добавить члена семьи</b>
+
+Чтобы добавить нового участника семьи:
+
+1. Попросите их написать боту @$bot_username
+2. Они должны отправить команду /start
+3. Затем дайте мне их имя пользователя или ID
+
+<b>Напишите имя пользователя нового участника:</b>
+<i>(например: @username или просто имя)</i>
+""")
+
+
+@lru_cache(maxsize=8)
+def _family_strings(language: Language) -> SimpleNamespace:
+    """Resolve the family screen strings once per language."""
+    return SimpleNamespace(
+        title=_('family.title', language),
+        description=_('family.description', language),
+        roles={
+            role.value: _(f'family.roles.{role.value}', language)
+            for role in (UserRole.PARENT, UserRole.CAREGIVER)
+        },
+    )
+
+
+@lru_cache(maxsize=8)
+def _command_templates(language: Language) -> Dict[str, Template]:
+    """Assemble the command reply templates once per language; only $-fields vary per call."""
+    def t(key: str, **placeholders) -> str:
+        return _(key, language, **placeholders)
+    
+    return {
+        "welcome": Template(f"""
+👋 <b>{t('welcome.title', name='$name')}</b>
+
+{t('welcome.description')}
+
+🌟 <b>Что я умею:</b>
+• {t('welcome.features.translate')}
+• {t('welcome.features.suggestions')}
+• {t('welcome.features.reports')}
+• {t('welcome.features.tracking')}
+
+{t('welcome.help_command')}
+
+<i>{t('welcome.ready')}</i>
+"""),
+        "help": Template(f"""
+❓ <b>{t('help.title')}</b>
+
+🌟 <b>Основные функции:</b>
+
+<b>🎯 {t('help.features.emotion_translation.title')}</b>
+{t('help.features.emotion_translation.description')}
+
+<b>👶 {t('help.features.child_management.title')}</b>
+{t('help.features.child_management.description')}
+
+<b>📊 {t('help.features.weekly_reports.title')}</b>
+{t('help.features.weekly_reports.description')}
+
+📱 <b>{t('help.commands.title')}</b>
+/start - {t('help.commands.start')}
+/help - {t('help.commands.help')}
+/settings - {t('help.commands.settings')}
+/test - {t('help.commands.test')}
+
+💡 <b>{t('help.tips.title')}</b>
+• {t('help.tips.specific')}
+• {t('help.tips.context')}
+• {t('help.tips.sharing')}
+
+{t('help.development_mode')}
+"""),
+        "test": Template(f"✅ <b>{t('success.bot_working')}</b>\n\n{t('success.polling_active')}"),
+        "no_children": Template(f"""
+👶 <b>{t('child_management.no_children.title')}</b>
+
+{t('child_management.no_children.description')}
+
+{t('child_management.no_children.cta')}
+"""),
+        "children_header": Template(f"👶 <b>{t('child_management.children_list.title', count='$count')}</b>\n\n"),
+        "children_item": Template(f"• $name ($age {t('common.years')})\n"),
+        "children_footer": Template(f"\n{t('child_management.children_list.manage_text')}"),
+        "translate_no_children": Template(f"""
+⚠️ <b>{t('emotion_translation.no_children.title')}</b>
+
+{t('emotion_translation.no_children.description')}
+
+{t('emotion_translation.no_children.cta')}
+"""),
+        "translate_select_child": Template(f"""
+🎯 <b>{t('emotion_translation.select_child.title')}</b>
+
+{t('emotion_translation.select_child.prompt')}
+
+{t('emotion_translation.select_child.cta')}
+"""),
+    }
+
+
+@lru_cache(maxsize=8)
+def _translation_failed_html(language: Language) -> str:
+    """Localized "translation failed" message, built once per language."""
+    return (
+        f"❌ <b>{_('emotion_translation.limits.translation_failed', language)}</b>\n\n"
+        f"{_('emotion_translation.limits.translation_failed_description', language)}"
+    )
+
+
+@lru_cache(maxsize=8)
+def _translation_templates(language: Language) -> Dict[str, Template]:
+    """Emotion-translation replies assembled once per language; only $-fields vary per call."""
+    def t(key: str, **placeholders) -> str:
+        text = _(key, language).replace("$", "$$")
+        return text.format(**placeholders) if placeholders else text
+    
+    return {
+        "processing": Template(
+            f"🔄 <b>{t('emotion_translation.processing.title')}</b>\n\n"
+            f"{t('emotion_translation.processing.description')}"
+        ),
+        "result": Template(f"""
+🎯 <b>{t('emotion_translation.result.title')}</b>
+
+📝 <b>{t('emotion_translation.result.situation')}</b>
+<i>"$situation"</i>
+
+$analysis
+
+💡 <b>Помните:</b> {t('emotion_translation.result.remember')}
+
+{t('emotion_translation.result.next_steps')}
+"""),
+        "context_prompt": Template(f"""
+📝 <b>{t('emotion_translation.context_prompt.title', child_name='$child_name')}</b>
+<i>{t('emotion_translation.context_prompt.message', message='$message')}</i>
+
+{t('emotion_translation.context_prompt.description')}
+
+{t('emotion_translation.context_prompt.examples')}
+
+<b>{t('emotion_translation.context_prompt.input')}</b>
+"""),
+        # Offline analysis shown when Claude is unavailable
+        "fallback": Template(f"""
+🎯 <b>{t('emotion_translation.fallback.title')}</b>
+
+📝 <b>{t('emotion_translation.result.situation')}</b>
+<i>"$situation"</i>
+
+**Обнаруженные эмоции:** {t('emotion_translation.fallback.emotions')}
+
+**Возможные причины:** {t('emotion_translation.fallback.reasons')}
+
+**Предлагаемые ответы:**
+1. {t('emotion_translation.fallback.responses.listen')}
+2. {t('emotion_translation.fallback.responses.validate')}
+3. {t('emotion_translation.fallback.responses.boundaries')}
+
+💡 <b>Помните:</b> {t('emotion_translation.result.remember')}
+
+<i>{t('emotion_translation.fallback.note')}</i>
+
+{t('emotion_translation.result.next_steps')}
+"""),
+    }
+
+
+async def _edit_if_changed(query, bot, text: str, reply_markup=None, parse_mode: str = "HTML"):
+    """Edit the callback message, sending only the parts that differ from what it shows."""
+    message = query.message
+    text_current, markup_current = (False, False)
+    if bot and message:
+        text_current, markup_current = bot.render_state(message, text, reply_markup)
+    
+    if text_current and markup_current:
+        logger.debug("Skipping unchanged render for message %s", message.message_id)
+        return
+    
+    try:
+        if text_current:
+            edited = await query.edit_message_reply_markup(reply_markup=reply_markup)
+        else:
+            edited = await query.edit_message_text(
+                text=text,
+                reply_markup=reply_markup,
+                parse_mode=parse_mode
+            )
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            raise
+        logger.debug("Telegram reports message %s unchanged", message.message_id if message else None)
+        return
+    
+    if bot and isinstance(edited, Message):
+        bot.remember_render(edited, text, reply_markup)
+
+
+async def _background_create_user(bot, update: Update):
+    """Register the /start user without holding up the welcome reply."""
+    try:
+        user_result = await bot.get_or_create_user(update)
+        if user_result:
+            logger.info(f"User successfully created/found in database")
+        else:
+            logger.warning("Database user creation returned None")
+    except Exception as e:
+        logger.warning(f"Background database operation failed: {e}", exc_info=_error_sampler.should_trace(type(e)))
+
 
 async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command."""
+    telegram_user = update.effective_user
     try:
-        logger.info(f"Start command from user {update.effective_user.id}")
+        logger.info(f"Start command from user {telegram_user.id}")
         
         # Set language to Russian for target audience
         set_language(Language.RUSSIAN)
         
         # Provide localized welcome message
-        welcome_text = f"""
-👋 <b>{_('welcome.title', name=update.effective_user.first_name)}</b>
-
-{_('welcome.description')}
-
-🌟 <b>Что я умею:</b>
-• {_('welcome.features.translate')}
-• {_('welcome.features.suggestions')}
-• {_('welcome.features.reports')}
-• {_('welcome.features.tracking')}
-
-{_('welcome.help_command')}
-
-<i>{_('welcome.ready')}</i>
-"""
+        welcome_text = _command_templates(Language.RUSSIAN)["welcome"].safe_substitute(
+            name=telegram_user.first_name
+        )
         
         await update.message.reply_text(
             text=welcome_text,
@@ -67,15 +453,8 @@ async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 logger.warning(f"Bot.db_manager is None - bot instance: {type(bot)}")
             
         if bot and bot.db_manager:
-            try:
-                logger.info(f"Background user creation for {update.effective_user.id}")
-                user_result = await bot.get_or_create_user(update)
-                if user_result:
-                    logger.info(f"User successfully created/found in database")
-                else:
-                    logger.warning("Database user creation returned None")
-            except Exception as e:
-                logger.warning(f"Background database operation failed: {e}", exc_info=True)
+            logger.info(f"Background user creation for {telegram_user.id}")
+            bot.run_in_background(_background_create_user(bot, update))
         else:
             logger.info("Skipping database operations - database manager not available")
         
@@ -84,7 +463,7 @@ async def start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Even if everything fails, provide basic response
         try:
             await update.message.reply_text(
-                text=f"👋 {_('common.hello')} {update.effective_user.first_name}! {_('common.welcome')} Family Emotions App.\n\n{_('welcome.help_command')}",
+                text=f"👋 {_('common.hello')} {telegram_user.first_name}! {_('common.welcome')} Family Emotions App.\n\n{_('welcome.help_command')}",
                 parse_mode="HTML"
             )
         except:
@@ -96,33 +475,7 @@ async def help_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         logger.info(f"Help command from user {update.effective_user.id}")
         
-        help_text = f"""
-❓ <b>{_('help.title')}</b>
-
-🌟 <b>Основные функции:</b>
-
-<b>🎯 {_('help.features.emotion_translation.title')}</b>
-{_('help.features.emotion_translation.description')}
-
-<b>👶 {_('help.features.child_management.title')}</b>
-{_('help.features.child_management.description')}
-
-<b>📊 {_('help.features.weekly_reports.title')}</b>
-{_('help.features.weekly_reports.description')}
-
-📱 <b>{_('help.commands.title')}</b>
-/start - {_('help.commands.start')}
-/help - {_('help.commands.help')}
-/settings - {_('help.commands.settings')}
-/test - {_('help.commands.test')}
-
-💡 <b>{_('help.tips.title')}</b>
-• {_('help.tips.specific')}
-• {_('help.tips.context')}
-• {_('help.tips.sharing')}
-
-{_('help.development_mode')}
-"""
+        help_text = _command_templates(get_language())["help"].safe_substitute()
         
         await update.message.reply_text(
             text=help_text,
@@ -140,7 +493,7 @@ async def test_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.info(f"Test command from user {update.effective_user.id}")
         
         await update.message.reply_text(
-            text=f"✅ <b>{_('success.bot_working')}</b>\n\n{_('success.polling_active')}",
+            text=_command_templates(get_language())["test"].safe_substitute(),
             parse_mode="HTML"
         )
         
@@ -180,22 +533,18 @@ async def children_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not user_result:
             return
         
-        user, _ = user_result
+        user = user_result[0]
+        templates = _command_templates(get_language())
         
         if not user.children:
-            text = f"""
-👶 <b>{_('child_management.no_children.title')}</b>
-
-{_('child_management.no_children.description')}
-
-{_('child_management.no_children.cta')}
-"""
+            text = templates["no_children"].safe_substitute()
         else:
-            text = f"👶 <b>{_('child_management.children_list.title', count=len(user.children))}</b>\n\n"
-            for child in user.children:
-                text += f"• {child.name} ({child.age} {_('common.years')})\n"
-            
-            text += f"\n{_('child_management.children_list.manage_text')}"
+            item = templates["children_item"]
+            text = "".join([
+                templates["children_header"].safe_substitute(count=len(user.children)),
+                *(item.safe_substitute(name=child.name, age=child.age) for child in user.children),
+                templates["children_footer"].safe_substitute(),
+            ])
         
         await update.message.reply_text(
             text=text,
@@ -217,18 +566,13 @@ async def translate_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not user_result:
             return
         
-        user, _ = user_result
+        user = user_result[0]
         user_context = bot.get_user_context(update.effective_user.id)
+        templates = _command_templates(get_language())
         
         # Check if user has children
         if not user.children:
-            text = f"""
-⚠️ <b>{_('emotion_translation.no_children.title')}</b>
-
-{_('emotion_translation.no_children.description')}
-
-{_('emotion_translation.no_children.cta')}
-"""
+            text = templates["translate_no_children"].safe_substitute()
             await update.message.reply_text(
                 text=text,
                 reply_markup=InlineKeyboards.main_menu(),
@@ -239,13 +583,7 @@ async def translate_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Start emotion translation flow
         user_context.set_state(ConversationStates.EMOTION_SELECT_CHILD)
         
-        text = f"""
-🎯 <b>{_('emotion_translation.select_child.title')}</b>
-
-{_('emotion_translation.select_child.prompt')}
-
-{_('emotion_translation.select_child.cta')}
-"""
+        text = templates["translate_select_child"].safe_substitute()
         
         await update.message.reply_text(
             text=text,
@@ -258,6 +596,20 @@ async def translate_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await bot.handle_error(update, context, "Не удалось начать перевод")
 
 
+def _log_callback_user(user):
+    """Dump the user loaded for a callback; only called when DEBUG logging is on."""
+    if user is None:
+        logger.debug("User loaded for callback: None")
+        return
+    
+    logger.debug("User loaded for callback: %s (id %s, telegram_id %s)", user.first_name, user.id, user.telegram_id)
+    children = getattr(user, 'children', None)
+    if children:
+        logger.debug("User has %d children: %s", len(children), [c.name for c in children])
+    else:
+        logger.debug("User has no children or children not loaded")
+
+
 async def callback_query_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle all callback queries from inline keyboards."""
     query = update.callback_query
@@ -265,150 +617,53 @@ async def callback_query_handler(update: Update, context: ContextTypes.DEFAULT_T
     
     try:
         await query.answer()  # Acknowledge the callback
-        logger.info(f"Callback query: {query.data} from user {update.effective_user.id}")
+        logger.info("Callback query: %s from user %s", query.data, update.effective_user.id)
+        
+        data = query.data
+        logger.debug("Processing callback data: %r", data)
         
-        # Load user from database for callbacks that need it
+        # Exact matches first, then the prefixed callbacks that carry an id
+        handler = _CALLBACK_DISPATCH.get(data)
+        match = None if handler else _CALLBACK_ID_RE.match(data)
+        
+        # Load user from database only for callbacks that need it
         user = None
-        if bot and hasattr(bot, 'get_or_create_user'):
+        needs_user = (handler or match) and data not in _USER_OPTIONAL_CALLBACKS
+        if needs_user and bot and hasattr(bot, 'get_or_create_user'):
             try:
                 result = await bot.get_or_create_user(update)
                 if result:
                     user = result[0]  # get_or_create_user returns (user, is_new)
-                logger.info(f"User loaded for callback: {user.first_name if user else 'None'}")
-                if user:
-                    logger.info(f"User ID: {user.id}, telegram_id: {user.telegram_id}")
-                    logger.info(f"User children loaded: {hasattr(user, 'children')}")
-                    if hasattr(user, 'children') and user.children:
-                        logger.info(f"User has {len(user.children)} children: {[c.name for c in user.children]}")
-                    else:
-                        logger.info("User has no children or children not loaded")
+                if logger.isEnabledFor(logging.DEBUG):
+                    _log_callback_user(user)
             except Exception as e:
                 logger.error(f"Error loading user for callback: {e}")
         
-        data = query.data
-        logger.info(f"Processing callback data: '{data}', type: {type(data)}")
+        if handler:
+            await handler(query, bot, user)
+            return
         
-        # Handle basic callbacks
-        if data == "main_menu":
-            await query.edit_message_text(
-                text=f"👋 <b>{_('common.welcome')}, {update.effective_user.first_name}!</b>\n\nЧто вы хотели бы сделать сегодня?",
-                reply_markup=InlineKeyboards.main_menu(),
-                parse_mode="HTML"
-            )
-            
-        elif data == "manage_children":
-            await query.edit_message_text(
-                text=f"👶 <b>Управление детьми</b>\n\nУправляйте профилями ваших детей для персонализированного анализа эмоций.\n\n<i>Функция скоро появится...</i>",
-                reply_markup=InlineKeyboards.child_management(),
-                parse_mode="HTML"
-            )
-            
-        elif data == "help":
-            await query.edit_message_text(
-                text=f"❓ <b>Помощь и поддержка</b>\n\nПолучите помощь по использованию Family Emotions App.\n\n<i>Полная система помощи скоро появится...</i>",
-                reply_markup=InlineKeyboards.help_menu(),
-                parse_mode="HTML"
-            )
-            
-        elif data == "settings":
-            await query.edit_message_text(
-                text=f"⚙️ <b>{_('settings.title')}</b>\n\nНастройте предпочтения приложения.\n\n<i>Панель настроек скоро появится...</i>",
-                reply_markup=InlineKeyboards.main_menu(),
-                parse_mode="HTML"
-            )
-            
-        elif data == "emotion_translate":
-            # Start emotion translation flow - first select child
-            user_context = bot.get_user_context(update.effective_user.id)
-            await handle_emotion_translate_start(query, bot, user, user_context)
-            
-        elif data == "view_reports":
-            await handle_view_reports(query, bot, user)
-            
-        elif data == "manage_family":
-            await handle_family_management(query, bot, user)
-            
-        elif data == "add_child":
-            # Start add child flow
-            await query.edit_message_text(
-                text="👶 <b>Add New Child</b>\n\nWhat is your child's name?\n\n<i>Please type the name below:</i>",
-                parse_mode="HTML"
-            )
-            
-            # Set conversation state for this user
-            if bot:
-                user_context = bot.get_user_context(update.effective_user.id)
-                user_context.current_state = "ADD_CHILD_NAME"
-                
-        elif data == "child_reports":
-            logger.info(f"Found child_reports condition! user={user}, bot={bot}")
-            try:
-                await handle_child_reports(query, bot, user)
-                logger.info("handle_child_reports completed successfully")
-            except Exception as e:
-                logger.error(f"Error in handle_child_reports: {e}", exc_info=True)
-                raise
-                
-        elif data == "family_list":
-            await handle_family_list(query, bot, user)
-            
-        elif data == "family_add":
-            await handle_family_add_start(query, bot, user)
-            
-        elif data == "family_permissions":
-            await handle_family_permissions(query, bot, user)
-            
-        elif data == "family_remove":
-            await handle_family_remove(query, bot, user)
-            
-        elif data.startswith("report_week_"):
-            # Handle different week reports
-            weeks_back = int(data.split("_")[-1])
-            await handle_view_reports_week(query, bot, user, weeks_back)
-            
-        elif data.startswith("child_report_"):
-            # Handle individual child report
-            child_id = data.split("_")[-1]
-            await handle_individual_child_report(query, bot, user, child_id)
-            
-        elif data.startswith("translate_child_"):
-            # Handle child selection for emotion translation
-            child_id = data.split("_")[-1]
-            user_context = bot.get_user_context(update.effective_user.id)
-            await handle_child_selection_for_translation(query, bot, user, user_context, child_id)
-            
-        elif data == "edit_child":
-            await handle_edit_child_start(query, bot, user)
-            
-        elif data.startswith("edit_child_"):
-            # Handle specific child editing
-            child_id = data.split("_")[-1]
-            await handle_edit_specific_child(query, bot, user, child_id)
-            
-        elif data == "remove_child":
-            await handle_remove_child_start(query, bot, user)
-            
-        elif data.startswith("remove_child_"):
-            # Handle specific child removal confirmation
-            child_id = data.split("_")[-1]
-            await handle_remove_specific_child_confirm(query, bot, user, child_id)
-            
-        elif data.startswith("confirm_remove_"):
-            # Handle confirmed removal
-            child_id = data.split("_")[-1]
-            await handle_confirm_remove_child(query, bot, user, child_id)
-            
-        else:
-            # Handle unknown callback
-            logger.warning(f"Unknown callback data: {data}")
-            await query.edit_message_text(
-                text="❌ Unknown action. Please try again.",
-                reply_markup=InlineKeyboards.main_menu(),
-                parse_mode="HTML"
-            )
+        if match:
+            prefix, arg = match.groups()
+            if prefix in _CHILD_ID_CALLBACKS:
+                if not _CHILD_UUID_RE.fullmatch(arg):
+                    await _send_error(query, "❌ <b>Ошибка</b>\n\nНеправильный идентификатор ребенка.")
+                    return
+                arg = UUID(arg)
+            target = update if prefix in _UPDATE_CALLBACKS else query
+            await _PREFIX_DISPATCH[prefix](target, bot, user, arg)
+            return
+        
+        # Handle unknown callback
+        logger.warning(f"Unknown callback data: {data}")
+        await query.edit_message_text(
+            text="❌ Unknown action. Please try again.",
+            reply_markup=InlineKeyboards.main_menu(),
+            parse_mode="HTML"
+        )
         
     except Exception as e:
-        logger.error(f"Error in callback handler: {e}", exc_info=True)
+        logger.error(f"Error in callback handler: {e}", exc_info=_error_sampler.should_trace(type(e)))
         logger.error(f"Failed on callback data: {query.data if query else 'no query'}")
         try:
             await query.edit_message_text(
@@ -422,8 +677,9 @@ async def callback_query_handler(update: Update, context: ContextTypes.DEFAULT_T
 
 async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle text messages based on conversation state."""
+    telegram_user = update.effective_user
     try:
-        logger.info(f"Message from user {update.effective_user.id}: {update.message.text}")
+        logger.info(f"Message from user {telegram_user.id}: {update.message.text}")
         
         bot = context.bot_data.get('bot_instance')
         if not bot:
@@ -432,7 +688,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
         
-        user_context = bot.get_user_context(update.effective_user.id)
+        user_context = bot.get_user_context(telegram_user.id)
         current_state = getattr(user_context, 'current_state', None)
         message_text = update.message.text
         
@@ -442,34 +698,21 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_result = await bot.get_or_create_user(update)
         if not user_result:
             # Database is unavailable, create a temporary user object for basic functionality
-            from types import SimpleNamespace
             user = SimpleNamespace(
-                id=f"temp_{update.effective_user.id}",
-                telegram_id=update.effective_user.id,
-                first_name=update.effective_user.first_name,
-                children=[]
+                id=f"temp_{telegram_user.id}",
+                telegram_id=telegram_user.id,
+                first_name=telegram_user.first_name,
+                children=[],
+                family_members=[]
             )
-            logger.info(f"Using temporary user object for {update.effective_user.id} due to database unavailability")
+            logger.info(f"Using temporary user object for {telegram_user.id} due to database unavailability")
         else:
-            user, _ = user_result
+            user = user_result[0]
         
         # Route message based on conversation state  
-        if current_state == "ADD_CHILD_NAME":
-            logger.info(f"Calling handle_add_child_name with consistent 5-arg signature")
-            await handle_add_child_name(update, bot, user, user_context, message_text)
-            
-        elif current_state == "ADD_CHILD_AGE":
-            await handle_add_child_age(update, bot, user, user_context, message_text)
-            
-        elif current_state == "EMOTION_TRANSLATE_INPUT":
-            await handle_emotion_translate_input(update, bot, user, user_context, message_text)
-            
-        elif current_state == ConversationStates.EMOTION_ENTER_MESSAGE:
-            await handle_emotion_message_input(update, bot, user, user_context, message_text)
-            
-        elif current_state == ConversationStates.EMOTION_ADD_CONTEXT:
-            await handle_emotion_context_input(update, bot, user, user_context, message_text)
-            
+        state_handler = _STATE_HANDLERS.get(current_state)
+        if state_handler:
+            await state_handler(update, bot, user, user_context, message_text)
         else:
             # Default response for unexpected messages
             await update.message.reply_text(
@@ -478,7 +721,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
         
     except Exception as e:
-        logger.error(f"Error in message handler: {e}", exc_info=True)
+        logger.error(f"Error in message handler: {e}", exc_info=_error_sampler.should_trace(type(e)))
         await update.message.reply_text(f"❌ {_('errors.processing_failed')}")
 
 
@@ -495,7 +738,7 @@ async def handle_add_child_name(update: Update, bot, user, user_context, name: s
             return
         
         user_context.temp_data["child_name"] = name.strip()
-        user_context.current_state = "ADD_CHILD_AGE"
+        user_context.set_state(ConversationStates.ADD_CHILD_AGE)
         
         await update.message.reply_text(
             text=f"👶 <b>Добавляем {name}</b>\n\n{_('child_management.add_child.age_prompt', name=name)}\n\n<i>{_('child_management.add_child.age_input')}</i>",
@@ -525,7 +768,6 @@ async def handle_add_child_age(update: Update, bot, user, user_context, age_text
         try:
             if bot.db_manager:
                 async with bot.db_manager.get_session() as session:
-                    from src.core.services import FamilyService
                     family_service = FamilyService(session)
                     
                     # Add child to database
@@ -534,6 +776,7 @@ async def handle_add_child_age(update: Update, bot, user, user_context, age_text
                         name=name,
                         age=age
                     )
+                    bot.forget_user(user.telegram_id)
                     logger.info(f"Child {name} ({age}) saved to database with ID {child.id}")
                     
                     success_text = f"""
@@ -590,80 +833,42 @@ async def handle_add_child_age(update: Update, bot, user, user_context, age_text
 async def handle_emotion_translate_input(update: Update, bot, user, user_context, message_text: str):
     """Handle emotion translation input with Claude API."""
     try:
-        user_context = bot.get_user_context(update.effective_user.id)
         user_context.current_state = None  # Reset state
         
         # Show processing message
+        templates = _translation_templates(get_language())
         processing_msg = await update.message.reply_text(
-            text=f"🔄 <b>{_('emotion_translation.processing.title')}</b>\n\n{_('emotion_translation.processing.description')}",
+            text=templates["processing"].safe_substitute(),
             parse_mode="HTML"
         )
         
         try:
-            # Call Claude API for emotion analysis
-            from anthropic import Anthropic
-            from src.core.config import settings
+            # Call Claude API for emotion analysis through the bot's shared async client
+            cache_key = bot.translation_cache_key(message_text)
+            analysis = bot.get_cached_translation(cache_key)
             
-            # Debug API key (mask most of it for security)
-            api_key = settings.anthropic.claude_api_key
-            if api_key:
-                masked_key = api_key[:10] + "***" + api_key[-4:] if len(api_key) > 14 else "***MASKED***"
-                logger.info(f"Using Claude API key: {masked_key}")
-            else:
-                logger.error("Claude API key is None or empty!")
+            if analysis is None:
+                client = bot.anthropic_client
+                prompt = _EMOTION_PROMPT_PREFIX + message_text + _EMOTION_PROMPT_SUFFIX
                 
-            # Try to debug the API call
-            logger.info(f"Creating Anthropic client with model: {settings.anthropic.model}")
-            
-            # Try with different base URLs in case of regional restrictions
-            base_urls_to_try = [
-                None,  # Default
-                "https://api.anthropic.com",  # Explicit default
-                "https://claude.ai/api",  # Alternative endpoint
-            ]
-            
-            # For now, just create default client - multiple base URLs don't help with 403 errors
-            client = Anthropic(api_key=api_key)
+                logger.info("Making Claude API request...")
+                await bot.claude_bucket.acquire(estimated_tokens=settings.anthropic.estimated_request_tokens)
+                async with bot.claude_semaphore:
+                    response = await client.messages.create(
+                        model=settings.anthropic.model,
+                        max_tokens=1000,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                analysis = response.content[0].text
+                logger.info(f"Claude API response received, length: {len(analysis)}")
+                bot.cache_translation(cache_key, analysis)
+            else:
+                logger.info("Serving emotion translation from cache")
             
-            prompt = f"""You are an expert child psychologist helping parents understand their child's emotions. 
-
-Analyze this situation and provide:
-1. What emotions the child is likely experiencing
-2. Possible reasons behind these emotions
-3. 3 specific, age-appropriate response suggestions
-
-Situation: "{message_text}"
-
-Respond in this format:
-**Emotions detected:** [list emotions]
-**Possible reasons:** [brief explanation]
-**Suggested responses:**
-1. [First response approach]
-2. [Second response approach] 
-3. [Third response approach]
-
-Keep responses practical, empathetic, and focused on connection with the child."""
-
-            logger.info("Making Claude API request...")
-            response = client.messages.create(
-                model=settings.anthropic.model,
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
+            result_text = templates["result"].safe_substitute(
+                situation=message_text,
+                analysis=analysis
             )
-            logger.info(f"Claude API response received, length: {len(response.content[0].text) if response.content else 0}")
-            
-            result_text = f"""
-🎯 <b>{_('emotion_translation.result.title')}</b>
-
-📝 <b>{_('emotion_translation.result.situation')}</b>
-<i>"{message_text}"</i>
-
-{response.content[0].text}
-
-💡 <b>Помните:</b> {_('emotion_translation.result.remember')}
-
-{_('emotion_translation.result.next_steps')}
-"""
             
             await processing_msg.edit_text(
                 text=result_text,
@@ -682,27 +887,7 @@ Keep responses practical, empathetic, and focused on connection with the child."
                 logger.warning("Claude API returning 403 Forbidden - likely IP/region restriction or API key issue")
             
             # Provide fallback emotional analysis without Claude API
-            fallback_analysis = f"""
-🎯 <b>{_('emotion_translation.fallback.title')}</b>
-
-📝 <b>{_('emotion_translation.result.situation')}</b>
-<i>"{message_text}"</i>
-
-**Обнаруженные эмоции:** {_('emotion_translation.fallback.emotions')}
-
-**Возможные причины:** {_('emotion_translation.fallback.reasons')}
-
-**Предлагаемые ответы:**
-1. {_('emotion_translation.fallback.responses.listen')}
-2. {_('emotion_translation.fallback.responses.validate')}
-3. {_('emotion_translation.fallback.responses.boundaries')}
-
-💡 <b>Помните:</b> {_('emotion_translation.result.remember')}
-
-<i>{_('emotion_translation.fallback.note')}</i>
-
-{_('emotion_translation.result.next_steps')}
-"""
+            fallback_analysis = templates["fallback"].safe_substitute(situation=message_text)
             
             await processing_msg.edit_text(
                 text=fallback_analysis,
@@ -763,11 +948,7 @@ async def handle_child_selection_for_translation(query, bot, user, user_context,
     """Handle child selection for emotion translation."""
     try:
         # Find the selected child
-        child = None
-        for c in user.children:
-            if str(c.id) == child_id:
-                child = c
-                break
+        child = user.get_child(child_id)
         
         if not child:
             await query.edit_message_text(
@@ -776,8 +957,8 @@ async def handle_child_selection_for_translation(query, bot, user, user_context,
             )
             return
         
-        from uuid import UUID
-        user_context.selected_child_id = UUID(child_id)
+        # Reuse the loaded child's UUID rather than re-parsing the callback string
+        user_context.selected_child_id = child.id
         user_context.set_state(ConversationStates.EMOTION_ENTER_MESSAGE)
         
         text = f"""
@@ -812,11 +993,7 @@ async def handle_emotion_message_input(update, bot, user, user_context, message_
         
         # Get selected child
         child_id = user_context.selected_child_id
-        child = None
-        for c in user.children:
-            if c.id == child_id:
-                child = c
-                break
+        child = user.get_child(child_id)
         
         if not child:
             await update.message.reply_text(
@@ -825,16 +1002,10 @@ async def handle_emotion_message_input(update, bot, user, user_context, message_
             )
             return
         
-        text = f"""
-📝 <b>{_('emotion_translation.context_prompt.title').format(child_name=child.name)}</b>
-<i>{_('emotion_translation.context_prompt.message').format(message=message_text)}</i>
-
-{_('emotion_translation.context_prompt.description')}
-
-{_('emotion_translation.context_prompt.examples')}
-
-<b>{_('emotion_translation.context_prompt.input')}</b>
-"""
+        text = _translation_templates(get_language())["context_prompt"].safe_substitute(
+            child_name=child.name,
+            message=message_text
+        )
         
         await update.message.reply_text(
             text=text,
@@ -846,173 +1017,212 @@ async def handle_emotion_message_input(update, bot, user, user_context, message_
         await bot.handle_error(update, None, "Error processing message")
 
 
-async def handle_emotion_context_input(update, bot, user, user_context, message_text):
-    """Handle additional context input and process emotion translation."""
+async def _cached_emotion_analysis(bot, cache_key: str):
+    """Return a cached Claude analysis, or None on a miss or cache error."""
     try:
-        await bot.send_typing_action(update.message.chat)
-        
-        # Get data from context
-        emotion_message = user_context.get_temp_data("emotion_message")
-        child_id = user_context.selected_child_id
-        
-        # Add context if provided
-        situation_context = None
-        if message_text.lower() != "skip":
-            situation_context = message_text
-        
-        # Process the emotion translation
-        processing_msg = await update.message.reply_text(
-            text="🔄 <b>Analyzing emotions...</b>\n\nThis may take a few seconds.",
-            parse_mode="HTML"
-        )
+        cached = await bot.cache_service.get_cached_emotion_analysis(cache_key)
+    except Exception as e:
+        logger.warning(f"Emotion analysis cache read failed: {e}")
+        return None
+    
+    if not cached:
+        return None
+    
+    logger.info("Serving emotion analysis from cache")
+    return EmotionAnalysisResponse(**cached)
+
+
+async def _store_emotion_analysis(bot, cache_key: str, analysis_result):
+    """Cache a Claude analysis; failures only cost a future cache miss."""
+    try:
+        await bot.cache_service.cache_emotion_analysis(cache_key, asdict(analysis_result))
+    except Exception as e:
+        logger.warning(f"Emotion analysis cache write failed: {e}")
+
+
+async def _create_translation_with_db(
+    session, user, child_id, emotion_message, situation_context, analysis: Dict[str, Any]
+):
+    """Persist a completed emotion translation; errors propagate to the caller."""
+    translation = EmotionTranslation(
+        user_id=user.id,
+        child_id=child_id,  # child_id is already a UUID
+        original_message=emotion_message,
+        situation_context=situation_context,
+        status=TranslationStatus.COMPLETED,
+        **analysis
+    )
+    
+    session.add(translation)
+    await session.commit()
+    await session.refresh(translation)
+    return translation
+
+
+async def _process_emotion_translation(
+    bot, user, processing_msg, emotion_message, situation_context, child_id
+):
+    """Analyze a submitted message and edit the processing message with the result."""
+    try:
+        # Resolved once for both the Claude request and the result display
+        child = user.get_child(child_id)
         
-        try:
-            # Create emotion translation with proper service initialization
-            if bot and bot.db_manager:
-                async with bot.db_manager.get_session() as session:
-                    from src.core.services import UserService
-                    from src.infrastructure.external import EmotionService, ClaudeService
+        # Create emotion translation with proper service initialization
+        if bot and bot.db_manager:
+            async with bot.db_manager.get_session() as session:
+                # Create services
+                user_service = UserService(session)
+                claude_service = bot.claude_service
+                
+                # Only the Claude call falls back to canned results; database errors reach the outer handler
+                try:
+                    if not child:
+                        raise Exception("Child not found")
                     
-                    # Create services
-                    user_service = UserService(session)
-                    claude_service = ClaudeService()  # May not work due to API restrictions
+                    # Create request for Claude API
+                    analysis_request = EmotionAnalysisRequest(
+                        child_message=emotion_message,
+                        child_age=child.age,
+                        child_name=child.name,
+                        situation_context=situation_context,
+                        personality_traits=child.personality_traits,
+                        special_needs=child.special_needs,
+                        interests=child.interests
+                    )
                     
-                    # Try to use real Claude API first
-                    try:
-                        # Get child for API request
-                        child = None
-                        for c in user.children:
-                            if c.id == child_id:
-                                child = c
-                                break
-                        
-                        if not child:
-                            raise Exception("Child not found")
-                        
-                        # Create request for Claude API
-                        from src.infrastructure.external.claude_service import EmotionAnalysisRequest
-                        
-                        analysis_request = EmotionAnalysisRequest(
-                            child_message=emotion_message,
-                            child_age=child.age,
-                            child_name=child.name,
-                            situation_context=situation_context,
-                            personality_traits=child.personality_traits,
-                            special_needs=child.special_needs,
-                            interests=child.interests
+                    # Identical message/context for an unchanged profile reuses the earlier analysis
+                    cache_key = None
+                    analysis_result = None
+                    if bot.cache_service:
+                        cache_key = bot.cache_service.emotion_analysis_key(
+                            child.id,
+                            emotion_message,
+                            situation_context,
+                            child.name,
+                            str(child.age),
+                            child.personality_traits,
+                            child.special_needs,
+                            child.interests,
+                            settings.anthropic.model
                         )
-                        
+                        analysis_result = await _cached_emotion_analysis(bot, cache_key)
+                    
+                    if analysis_result is None:
                         logger.info(f"Sending request to Claude API for child {child.name}")
                         
-                        # Call Claude API
+                        # Call Claude API; the service waits on the bot's bucket, then its semaphore
                         analysis_result = await claude_service.analyze_child_emotions(analysis_request)
                         
                         logger.info(f"Claude API responded with emotions: {analysis_result.detected_emotions}")
-                        
-                        # Create emotion translation with real API results
-                        from src.core.models.emotion import EmotionTranslation, TranslationStatus
-                        
-                        translation = EmotionTranslation(
-                            user_id=user.id,
-                            child_id=child_id,
-                            original_message=emotion_message,
-                            situation_context=situation_context,
-                            status=TranslationStatus.COMPLETED,
-                            translated_emotions=analysis_result.detected_emotions,
-                            confidence_score=analysis_result.confidence_score,
-                            processing_time_ms=analysis_result.processing_time_ms,
-                            response_options=analysis_result.response_options
-                        )
-                        
-                        session.add(translation)
-                        await session.commit()
-                        await session.refresh(translation)
-                        
-                        logger.info(f"Created emotion translation {translation.id} for user {user.id} with real Claude API")
-                        
-                    except Exception as e:
-                        logger.error(f"Claude API failed, using fallback: {e}")
-                        
-                        # Fallback to mock data if Claude API fails
-                        from src.core.models.emotion import EmotionTranslation, TranslationStatus
-                        
-                        translation = EmotionTranslation(
-                            user_id=user.id,
-                            child_id=child_id,  # child_id is already a UUID
-                            original_message=emotion_message,
-                            situation_context=situation_context,
-                            status=TranslationStatus.COMPLETED,  # Mark as completed for now
-                            translated_emotions=["curious", "excited"],  # Mock data
-                            confidence_score=0.8,
-                            processing_time_ms=100,
-                            response_options=[
-                                {"title": "Validate Feelings", "text": "I see you're feeling curious! That's a wonderful quality.", "approach": "Emotional validation"},
-                                {"title": "Encourage Learning", "text": "You seem excited to learn more. What would you like to explore next?", "approach": "Learning encouragement"}
-                            ]
-                        )
-                        
-                        session.add(translation)
-                        await session.commit()
-                        await session.refresh(translation)
-                        
-                        logger.info(f"Created fallback emotion translation {translation.id} for user {user.id}")
-            else:
-                # Create a mock translation for testing
-                from src.core.models.emotion import EmotionTranslation, TranslationStatus
-                from uuid import uuid4
+                        if cache_key:
+                            await _store_emotion_analysis(bot, cache_key, analysis_result)
+                    
+                    analysis = dict(
+                        translated_emotions=analysis_result.detected_emotions,
+                        confidence_score=analysis_result.confidence_score,
+                        processing_time_ms=analysis_result.processing_time_ms,
+                        response_options=analysis_result.response_options
+                    )
+                    source = "real Claude API"
+                    
+                except Exception as e:
+                    logger.error(f"Claude API failed, using fallback: {e}")
+                    
+                    # Fallback to mock data if Claude API fails
+                    analysis = dict(
+                        translated_emotions=["curious", "excited"],  # Mock data
+                        confidence_score=0.8,
+                        processing_time_ms=100,
+                        response_options=[
+                            {"title": "Validate Feelings", "text": "I see you're feeling curious! That's a wonderful quality.", "approach": "Emotional validation"},
+                            {"title": "Encourage Learning", "text": "You seem excited to learn more. What would you like to explore next?", "approach": "Learning encouragement"}
+                        ]
+                    )
+                    source = "fallback results"
                 
-                translation = EmotionTranslation()
-                translation.id = uuid4()
-                translation.user_id = user.id
-                translation.child_id = child_id  # child_id is already a UUID
-                translation.original_message = emotion_message
-                translation.situation_context = situation_context
-                translation.status = TranslationStatus.COMPLETED
-                translation.translated_emotions = ["happy", "curious"]
-                translation.confidence_score = 0.75
-                translation.response_options = [
-                    {"title": "Validate Feelings", "text": "I see you're feeling happy! That's wonderful.", "approach": "Emotional validation"},
-                    {"title": "Encourage Exploration", "text": "You seem curious about something. Tell me more about what interests you!", "approach": "Curiosity encouragement"}
-                ]
-                translation.processing_time_ms = 120
-            
-            # Get child for display
-            child = None
-            for c in user.children:
-                if c.id == child_id:  # child_id is already a UUID
-                    child = c
-                    break
-            
-            # Format and send results
-            result_text = await bot.format_emotion_translation_result(
-                translation, 
-                child.name if child else "your child"
-            )
-            
-            await processing_msg.edit_text(
-                text=result_text,
-                reply_markup=InlineKeyboards.emotion_results_actions(str(translation.id)),
-                parse_mode="HTML"
-            )
-            
-            # Clear context
-            user_context.clear()
-            user_context.set_state(ConversationStates.MAIN_MENU)
-            
-        except RateLimitExceededError:
-            await processing_msg.edit_text(
-                text="⏳ <b>Daily limit reached</b>\n\nYou've used all your daily translations. Upgrade to Premium for more requests!",
-                reply_markup=InlineKeyboards.main_menu(),
-                parse_mode="HTML"
-            )
-            
-        except Exception as e:
-            logger.error(f"Error processing translation: {e}")
-            await processing_msg.edit_text(
-                text=f"❌ <b>{_('emotion_translation.limits.translation_failed')}</b>\n\n{_('emotion_translation.limits.translation_failed_description')}",
-                reply_markup=InlineKeyboards.main_menu(),
-                parse_mode="HTML"
+                translation = await _create_translation_with_db(
+                    session, user, child_id, emotion_message, situation_context, analysis
+                )
+                logger.info(f"Created emotion translation {translation.id} for user {user.id} with {source}")
+                if bot.cache_service:
+                    bot.run_in_background(
+                        bot.cache_service.invalidate_weekly_reports(user.id, current_week_only=True)
+                    )
+        else:
+            # Create a mock translation for testing
+            translation = EmotionTranslation()
+            translation.id = uuid4()
+            translation.user_id = user.id
+            translation.child_id = child_id  # child_id is already a UUID
+            translation.original_message = emotion_message
+            translation.situation_context = situation_context
+            translation.status = TranslationStatus.COMPLETED
+            translation.translated_emotions = ["happy", "curious"]
+            translation.confidence_score = 0.75
+            translation.response_options = [
+                {"title": "Validate Feelings", "text": "I see you're feeling happy! That's wonderful.", "approach": "Emotional validation"},
+                {"title": "Encourage Exploration", "text": "You seem curious about something. Tell me more about what interests you!", "approach": "Curiosity encouragement"}
+            ]
+            translation.processing_time_ms = 120
+        
+        # Format and send results
+        result_text = bot.format_emotion_translation_result_sync(
+            translation, 
+            child.name if child else "your child"
+        )
+        
+        await processing_msg.edit_text(
+            text=result_text,
+            reply_markup=InlineKeyboards.emotion_results_actions(str(translation.id)),
+            parse_mode="HTML"
+        )
+        
+    except RateLimitExceededError:
+        await processing_msg.edit_text(
+            text=_RATE_LIMIT_HTML,
+            reply_markup=InlineKeyboards.main_menu(),
+            parse_mode="HTML"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error processing translation: {e}")
+        await processing_msg.edit_text(
+            text=_translation_failed_html(get_language()),
+            reply_markup=InlineKeyboards.main_menu(),
+            parse_mode="HTML"
+        )
+
+
+async def handle_emotion_context_input(update, bot, user, user_context, message_text):
+    """Handle additional context input and process emotion translation."""
+    try:
+        await bot.send_typing_action(update.message.chat)
+        
+        # Get data from context
+        emotion_message = user_context.get_temp_data("emotion_message")
+        child_id = user_context.selected_child_id
+        
+        # Add context if provided
+        situation_context = None
+        if message_text.strip() not in _SKIP_TOKENS:
+            situation_context = message_text
+        
+        # Process the emotion translation
+        processing_msg = await update.message.reply_text(
+            text=_ANALYZING_HTML,
+            parse_mode="HTML"
+        )
+        
+        # Analysis is slow; run it on the chat's queue so this update returns now
+        # and later submissions from the same chat are answered in order
+        user_context.clear()
+        user_context.set_state(ConversationStates.MAIN_MENU)
+        bot.submit_chat_job(
+            update.effective_chat.id,
+            _process_emotion_translation(
+                bot, user, processing_msg, emotion_message, situation_context, child_id
             )
+        )
         
     except Exception as e:
         logger.error(f"Error handling emotion context: {e}")
@@ -1055,13 +1265,7 @@ async def handle_add_child_start(update, bot, user, user_context):
     user_context.clear()
     user_context.set_state(ConversationStates.ADD_CHILD_NAME)
     
-    text = """
-👶 <b>Add New Child</b>
-
-What is your child's name?
-
-<i>Type the name below:</i>
-"""
+    text = _ADD_CHILD_NAME_PROMPT
     
     # Handle both query and update objects
     if hasattr(update, 'edit_message_text'):
@@ -1078,57 +1282,34 @@ What is your child's name?
 
 async def handle_add_child_personality(update, bot, user, user_context, personality):
     """Handle child personality input."""
-    if personality.lower() != "skip":
+    if personality.strip() not in _SKIP_TOKENS:
         user_context.set_temp_data("child_personality", personality)
     
     user_context.set_state(ConversationStates.ADD_CHILD_INTERESTS)
     name = user_context.get_temp_data("child_name")
     
-    text = f"""
-👶 <b>Adding {name}</b>
-
-What are {name}'s main interests and hobbies? This helps me suggest more relevant responses.
-
-For example:
-• "Loves dinosaurs, drawing, and video games"
-• "Enjoys dancing, music, and playing with dolls"
-• "Interested in sports, especially soccer and basketball"
-
-<i>List their interests below, or type "skip" to continue:</i>
-"""
+    text = _ADD_CHILD_INTERESTS_TEMPLATE.substitute(name=name)
     
-    await update.message.reply_text(
+    await update.effective_message.reply_text(
         text=text,
-        reply_markup=InlineKeyboards.skip_optional(),
+        reply_markup=InlineKeyboards.skip_optional(ConversationStates.ADD_CHILD_INTERESTS),
         parse_mode="HTML"
     )
 
 
 async def handle_add_child_interests(update, bot, user, user_context, interests):
     """Handle child interests input."""
-    if interests.lower() != "skip":
+    if interests.strip() not in _SKIP_TOKENS:
         user_context.set_temp_data("child_interests", interests)
     
     user_context.set_state(ConversationStates.ADD_CHILD_SPECIAL_NEEDS)
     name = user_context.get_temp_data("child_name")
     
-    text = f"""
-👶 <b>Adding {name}</b>
-
-Are there any special considerations I should know about {name}? This could include:
-
-• Learning differences or challenges
-• Medical conditions that affect behavior
-• Therapy or treatment programs
-• Communication preferences
-• Sensory sensitivities
-
-<i>Add special considerations below, or type "skip" to finish:</i>
-"""
+    text = _ADD_CHILD_SPECIAL_NEEDS_TEMPLATE.substitute(name=name)
     
-    await update.message.reply_text(
+    await update.effective_message.reply_text(
         text=text,
-        reply_markup=InlineKeyboards.skip_optional(),
+        reply_markup=InlineKeyboards.skip_optional(ConversationStates.ADD_CHILD_SPECIAL_NEEDS),
         parse_mode="HTML"
     )
 
@@ -1136,17 +1317,17 @@ Are there any special considerations I should know about {name}? This could incl
 async def handle_add_child_special_needs(update, bot, user, user_context, special_needs):
     """Handle special needs input and create the child."""
     try:
-        await bot.send_typing_action(update.message.chat)
+        await bot.send_typing_action(update.effective_chat)
         
         # Collect all data
         name = user_context.get_temp_data("child_name")
         age = user_context.get_temp_data("child_age")
         personality = user_context.get_temp_data("child_personality")
         interests = user_context.get_temp_data("child_interests")
-        special_considerations = special_needs if special_needs.lower() != "skip" else None
+        special_considerations = special_needs if special_needs.strip() not in _SKIP_TOKENS else None
         
-        # Create the child
-        child = await bot.family_service.add_child(
+        # Create the child, reusing a pooled connection when no long-lived service is injected
+        child_data = dict(
             parent_id=user.id,
             name=name,
             age=age,
@@ -1154,35 +1335,34 @@ async def handle_add_child_special_needs(update, bot, user, user_context, specia
             interests=interests,
             special_needs=special_considerations
         )
-        
-        # Track child creation
-        await bot.analytics_service.track_event(
-            event_type="child_added",
-            user_id=user.id,
-            user_telegram_id=user.telegram_id,
-            event_data={
-                "child_id": str(child.id),
-                "child_age": age,
-                "has_personality": bool(personality),
-                "has_interests": bool(interests),
-                "has_special_needs": bool(special_considerations)
-            }
-        )
+        if bot.family_service:
+            child = await bot.family_service.add_child(**child_data)
+        else:
+            async with bot.db_manager.get_session() as session:
+                child = await FamilyService(session).add_child(**child_data)
+        bot.forget_user(user.telegram_id)
+        
+        # Track child creation without delaying the reply
+        if bot.analytics_service:
+            bot.run_in_background(bot.analytics_service.track_event(
+                event_type="child_added",
+                user_id=user.id,
+                user_telegram_id=user.telegram_id,
+                event_data={
+                    "child_id": str(child.id),
+                    "child_age": age,
+                    "has_personality": bool(personality),
+                    "has_interests": bool(interests),
+                    "has_special_needs": bool(special_considerations)
+                }
+            ))
         
         # Format success message
         child_profile = await bot.format_child_profile(child)
         
-        success_text = f"""
-✅ <b>Child Added Successfully!</b>
-
-{child_profile}
-
-{name} has been added to your family profile. You can now get personalized emotion translations and analysis!
-
-What would you like to do next? 👇
-"""
+        success_text = _ADD_CHILD_SUCCESS_TEMPLATE.substitute(child_profile=child_profile, name=name)
         
-        await update.message.reply_text(
+        await update.effective_message.reply_text(
             text=success_text,
             reply_markup=InlineKeyboards.main_menu(),
             parse_mode="HTML"
@@ -1201,16 +1381,13 @@ What would you like to do next? 👇
 
 async def handle_settings_menu(query, bot, user):
     """Handle settings menu."""
-    text = f"""
-⚙️ <b>Settings</b>
-
-<b>Account:</b> {user.first_name}
-<b>Language:</b> {user.language_code.upper()}
-<b>Subscription:</b> {user.subscription_status.value.title()}
-<b>Daily Usage:</b> {user.daily_requests_count}/{'50' if user.subscription_status.value == 'premium' else '5'}
-
-What would you like to configure? 👇
-"""
+    text = _SETTINGS_TEMPLATE.substitute(
+        first_name=user.first_name,
+        language=user.language_code.upper(),
+        subscription=user.subscription_status.value.title(),
+        daily_used=user.daily_requests_count,
+        daily_limit='50' if user.subscription_status.value == 'premium' else '5'
+    )
     
     await query.edit_message_text(
         text=text,
@@ -1221,16 +1398,8 @@ What would you like to configure? 👇
 
 async def handle_reports_menu(query, bot, user):
     """Handle reports menu."""
-    text = """
-📊 <b>Weekly Reports</b>
-
-View comprehensive emotional development reports for your children.
-
-Choose a timeframe or child below 👇
-"""
-    
     await query.edit_message_text(
-        text=text,
+        text=_REPORTS_MENU_TEXT,
         reply_markup=InlineKeyboards.reports_menu(),
         parse_mode="HTML"
     )
@@ -1238,16 +1407,8 @@ Choose a timeframe or child below 👇
 
 async def handle_help_menu(query, bot, user):
     """Handle help menu."""
-    text = """
-❓ <b>Help & Support</b>
-
-Get help with using the Family Emotions App and understanding your child's emotional development.
-
-What do you need help with? 👇
-"""
-    
     await query.edit_message_text(
-        text=text,
+        text=_HELP_MENU_TEXT,
         reply_markup=InlineKeyboards.help_menu(),
         parse_mode="HTML"
     )
@@ -1255,17 +1416,17 @@ What do you need help with? 👇
 
 async def handle_family_management(query, bot, user):
     """Handle family management menu."""
-    from src.core.localization.translator import _
+    strings = _family_strings(get_language())
     
     # Count all family members including children
-    family_members_count = len(user.family_members) if hasattr(user, 'family_members') and user.family_members else 0
-    children_count = len(user.children) if hasattr(user, 'children') and user.children else 0
+    family_members_count = user.family_members_count
+    children_count = user.children_count
     total_family = family_members_count + children_count
     
     text = f"""
-👨‍👩‍👧‍👦 <b>{_('family.title')}</b>
+👨‍👩‍👧‍👦 <b>{strings.title}</b>
 
-{_('family.description')}
+{strings.description}
 
 <b>Участники семьи:</b> {total_family} + Вы
 <i>• Взрослые участники: {family_members_count}
@@ -1274,86 +1435,57 @@ async def handle_family_management(query, bot, user):
 Что вы хотите сделать? 👇
 """
     
-    await query.edit_message_text(
-        text=text,
-        reply_markup=InlineKeyboards.family_management(),
-        parse_mode="HTML"
-    )
+    await _edit_if_changed(query, bot, text, InlineKeyboards.family_management())
 
 
 async def handle_family_list(query, bot, user):
     """Show list of family members and children."""
-    from src.core.localization.translator import _
-    
-    logger.info(f"handle_family_list called for user {user.id}")
-    logger.info(f"User has children attribute: {hasattr(user, 'children')}")
-    logger.info(f"User has family_members attribute: {hasattr(user, 'family_members')}")
+    strings = _family_strings(get_language())
     
     # Prepare lists
-    family_members = user.family_members if hasattr(user, 'family_members') and user.family_members else []
-    children = user.children if hasattr(user, 'children') and user.children else []
-    
-    logger.info(f"Family members count: {len(family_members)}")
-    logger.info(f"Children count: {len(children)}")
+    family_members = user.family_members
+    children = user.children
     
-    if children:
-        logger.info(f"Children details: {[(child.name, child.age) for child in children]}")
-    else:
-        logger.info("No children found or children list is empty")
+    logger.debug(
+        "family_list: u=%s nchildren=%d nmembers=%d",
+        user.id, user.children_count, user.family_members_count
+    )
+    if children and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("family_list children: %s", [(child.name, child.age) for child in children])
     
-    text = f"""
-👨‍👩‍👧‍👦 <b>{_('family.title')}</b>
-
-<b>Участники семьи:</b>
-👤 {user.first_name} (Вы) - Главный родитель
-"""
+    parts = [
+        f"\n👨‍👩‍👧‍👦 <b>{strings.title}</b>\n"
+        f"\n<b>Участники семьи:</b>"
+        f"\n👤 {user.first_name} (Вы) - Главный родитель\n"
+    ]
     
     # Add adult family members
-    if family_members:
-        for member in family_members:
-            role_emoji = "👨‍👩‍👧‍👦" if member.role == "parent" else "🧑‍🍼"
-            text += f"\n{role_emoji} {member.name} - {_('family.roles.' + member.role)}"
+    for member in family_members:
+        role_emoji = ROLE_EMOJI.get(member.role, DEFAULT_ROLE_EMOJI)
+        role_name = strings.roles.get(member.role) or _('family.roles.' + member.role)
+        parts.append(f"\n{role_emoji} {member.name} - {role_name}")
     
     # Add children
     if children:
-        text += f"\n\n<b>Дети в семье:</b>"
-        for child in children:
-            text += f"\n👶 {child.name} ({child.age} лет)"
-            logger.info(f"Added child to display: {child.name} ({child.age})")
-    else:
-        logger.info("No children to display - children list is empty")
+        parts.append("\n\n<b>Дети в семье:</b>")
+        parts.extend(f"\n👶 {child.display_label}" for child in children)
     
     # Summary
-    total_count = 1 + len(family_members) + len(children)
-    text += f"\n\n<b>Всего участников:</b> {total_count}"
-    
-    logger.info(f"Final family list text length: {len(text)}")
+    total_count = 1 + user.family_members_count + user.children_count
+    parts.append(f"\n\n<b>Всего участников:</b> {total_count}")
     
     if not family_members and not children:
-        text += f"\n\n<i>У вас пока нет дополнительных участников семьи.</i>"
-        text += f"\n\nДобавьте супруга/супругу или детей для совместной работы с эмоциональным анализом."
+        parts.append("\n\n<i>У вас пока нет дополнительных участников семьи.</i>")
+        parts.append("\n\nДобавьте супруга/супругу или детей для совместной работы с эмоциональным анализом.")
     
-    await query.edit_message_text(
-        text=text,
-        reply_markup=InlineKeyboards.family_management(),
-        parse_mode="HTML"
-    )
+    text = "".join(parts)
+    
+    await _edit_if_changed(query, bot, text, InlineKeyboards.family_management())
 
 
 async def handle_family_add_start(query, bot, user):
     """Start adding a family member."""
-    text = f"""
-➕ <b>Добавить члена семьи</b>
-
-Чтобы добавить нового участника семьи:
-
-1. Попросите их написать боту @{bot.username if hasattr(bot, 'username') else 'family_emotions_bot'}
-2. Они должны отправить команду /start
-3. Затем дайте мне их имя пользователя или ID
-
-<b>Напишите имя пользователя нового участника:</b>
-<i>(например: @username или просто имя)</i>
-"""
+    text = _FAMILY_ADD_TEMPLATE.substitute(bot_username=query.get_bot().username)
     
     await query.edit_message_text(
         text=text,
@@ -1363,7 +1495,7 @@ async def handle_family_add_start(query, bot, user):
     # Set conversation state
     if bot:
         user_context = bot.get_user_context(query.from_user.id)
-        user_context.set_state("ADD_FAMILY_MEMBER")
+        user_context.set_state(ConversationStates.FAMILY_ADD_MEMBER)
 
 
 async def handle_family_permissions(query, bot, user):
@@ -1391,17 +1523,11 @@ async def handle_family_permissions(query, bot, user):
 """
     
     # Create keyboard with family members
-    keyboard = []
-    for member in user.family_members:
-        keyboard.append([
-            InlineKeyboardButton(
-                f"👤 {member.name}", 
-                callback_data=f"edit_permissions_{member.id}"
-            )
-        ])
-    keyboard.append([
-        InlineKeyboardButton("🔙 Назад", callback_data="manage_family")
-    ])
+    keyboard = [
+        [InlineKeyboardButton(f"👤 {member.name}", callback_data=f"edit_permissions_{member.id}")]
+        for member in user.family_members
+    ]
+    keyboard.append([_BACK_TO_MANAGE_FAMILY])
     
     await query.edit_message_text(
         text=text,
@@ -1434,17 +1560,11 @@ async def handle_family_remove(query, bot, user):
 """
     
     # Create keyboard with family members
-    keyboard = []
-    for member in user.family_members:
-        keyboard.append([
-            InlineKeyboardButton(
-                f"❌ {member.name}", 
-                callback_data=f"confirm_remove_{member.id}"
-            )
-        ])
-    keyboard.append([
-        InlineKeyboardButton("🔙 Назад", callback_data="manage_family")
-    ])
+    keyboard = [
+        [InlineKeyboardButton(f"❌ {member.name}", callback_data=f"confirm_remove_{member.id}")]
+        for member in user.family_members
+    ]
+    keyboard.append([_BACK_TO_MANAGE_FAMILY])
     
     await query.edit_message_text(
         text=text,
@@ -1455,10 +1575,8 @@ async def handle_family_remove(query, bot, user):
 
 async def handle_child_reports(query, bot, user):
     """Handle child-specific reports."""
-    from src.core.localization.translator import _
-    
     try:
-        logger.info(f"handle_child_reports called for user {user.id if user else 'None'}")
+        logger.debug("child_reports: u=%s", user.id if user else None)
         
         # Check if user is None
         if not user:
@@ -1470,14 +1588,12 @@ async def handle_child_reports(query, bot, user):
             )
             return
             
-        logger.info(f"User has children attribute: {hasattr(user, 'children')}")
-        if hasattr(user, 'children'):
-            logger.info(f"Number of children: {len(user.children) if user.children else 0}")
-            if user.children:
-                logger.info(f"Children: {[f'{c.name} (age {c.age})' for c in user.children]}")
+        children = getattr(user, 'children', None) or ()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("child_reports children: %s", [(c.name, c.age) for c in children])
         
         # Check if user has children
-        if not user.children or len(user.children) == 0:
+        if not children:
             await query.edit_message_text(
                 text=f"""
 📊 <b>Отчеты о детях</b>
@@ -1511,19 +1627,13 @@ async def handle_child_reports(query, bot, user):
 """
         
         # Create keyboard with children
-        keyboard = []
-        for child in user.children:
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"📊 {child.name} ({child.age} лет)", 
-                    callback_data=f"child_report_{child.id}"
-                )
-            ])
+        keyboard = [
+            [InlineKeyboardButton(f"📊 {child.display_label}", callback_data=f"child_report_{child.id}")]
+            for child in children
+        ]
         
         # Add back button
-        keyboard.append([
-            InlineKeyboardButton("🔙 Назад", callback_data="manage_children")
-        ])
+        keyboard.append([_BACK_TO_MANAGE_CHILDREN])
         
         await query.edit_message_text(
             text=text,
@@ -1532,37 +1642,15 @@ async def handle_child_reports(query, bot, user):
         )
     
     except Exception as e:
-        logger.error(f"Error in handle_child_reports: {e}", exc_info=True)
-        await query.edit_message_text(
-            text="❌ <b>Ошибка</b>\n\nНе удалось загрузить отчеты.",
-            reply_markup=InlineKeyboards.child_management(),
-            parse_mode="HTML"
-        )
+        logger.error(f"Error in handle_child_reports: {e}", exc_info=_error_sampler.should_trace(type(e)))
+        await _send_error(query, "❌ <b>Ошибка</b>\n\nНе удалось загрузить отчеты.", InlineKeyboards.child_management())
 
 
-async def handle_individual_child_report(query, bot, user, child_id):
+async def handle_individual_child_report(query, bot, user, child_uuid: UUID):
     """Handle individual child report display."""
-    from uuid import UUID
-    from src.core.localization.translator import _
-    
     try:
-        # Convert child_id to UUID
-        try:
-            child_uuid = UUID(child_id)
-        except ValueError:
-            await query.edit_message_text(
-                text="❌ <b>Ошибка</b>\n\nНеправильный идентификатор ребенка.",
-                reply_markup=InlineKeyboards.child_management(),
-                parse_mode="HTML"
-            )
-            return
-        
         # Find the child
-        child = None
-        for c in user.children:
-            if c.id == child_uuid:
-                child = c
-                break
+        child = user.get_child(child_uuid)
                 
         if not child:
             await query.edit_message_text(
@@ -1575,7 +1663,6 @@ async def handle_individual_child_report(query, bot, user, child_id):
         # Generate individual child report
         if bot and bot.db_manager:
             async with bot.db_manager.get_session() as session:
-                from src.core.services import ReportService
                 report_service = ReportService(session)
                 
                 # Get emotion statistics for this child
@@ -1584,8 +1671,8 @@ async def handle_individual_child_report(query, bot, user, child_id):
                 # Filter data for specific child
                 child_activity = emotion_stats.get('child_activity', {}).get(child.name, 0)
                 
-                # Generate child-specific report
-                report_text = f"""
+                # Generate child-specific report; sections are collected and joined once
+                parts = [f"""
 📊 <b>Отчет о ребенке: {child.name}</b>
 📅 <i>За текущую неделю</i>
 
@@ -1594,87 +1681,73 @@ async def handle_individual_child_report(query, bot, user, child_id):
 • Анализов эмоций: {child_activity}
 
 🎭 <b>Эмоциональная активность:</b>
-"""
+"""]
                 
                 if child_activity > 0:
-                    # Get child-specific emotion translations
-                    from sqlalchemy import select, and_
-                    from src.core.models.emotion import EmotionTranslation, TranslationStatus
-                    from datetime import datetime, timezone, timedelta
-                    
-                    # Calculate current week boundaries
-                    today = datetime.now(timezone.utc).date()
-                    week_start = today - timedelta(days=today.weekday())
-                    week_end = week_start + timedelta(days=6)
-                    week_start_dt = datetime.combine(week_start, datetime.min.time()).replace(tzinfo=timezone.utc)
-                    week_end_dt = datetime.combine(week_end, datetime.max.time()).replace(tzinfo=timezone.utc)
+                    # Current week as a half-open [Monday 00:00, next Monday 00:00) UTC range
+                    now = datetime.now(timezone.utc)
+                    week_start_dt = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=now.weekday())
+                    week_end_dt = week_start_dt + timedelta(days=7)
                     
-                    # Get translations for this specific child
-                    child_translations_stmt = (
-                        select(EmotionTranslation)
-                        .where(
-                            and_(
-                                EmotionTranslation.user_id == user.id,
-                                EmotionTranslation.child_id == child_uuid,
-                                EmotionTranslation.created_at >= week_start_dt,
-                                EmotionTranslation.created_at <= week_end_dt,
-                                EmotionTranslation.status == TranslationStatus.COMPLETED
-                            )
-                        )
+                    # Translations for this specific child
+                    child_filter = and_(
+                        EmotionTranslation.user_id == user.id,
+                        EmotionTranslation.child_id == child_uuid,
+                        EmotionTranslation.created_at >= week_start_dt,
+                        EmotionTranslation.created_at < week_end_dt,
+                        EmotionTranslation.status == TranslationStatus.COMPLETED
+                    )
+                    translation_count = await session.scalar(
+                        select(func.count()).select_from(EmotionTranslation).where(child_filter)
                     )
-                    child_translations_result = await session.execute(child_translations_stmt)
-                    child_translations = list(child_translations_result.scalars().all())
                     
-                    if child_translations:
-                        # Count emotions for this child
-                        child_emotions = {}
-                        for translation in child_translations:
-                            if translation.translated_emotions:
-                                for emotion in translation.translated_emotions:
-                                    child_emotions[emotion] = child_emotions.get(emotion, 0) + 1
+                    if translation_count:
+                        # Let Postgres unnest and count the emotions; only the top 5 come back
+                        emotions = (
+                            select(func.json_array_elements_text(EmotionTranslation.translated_emotions).label("emotion"))
+                            .where(child_filter, func.json_typeof(EmotionTranslation.translated_emotions) == "array")
+                            .subquery()
+                        )
+                        top_emotions_result = await session.execute(
+                            select(emotions.c.emotion, func.count().label("n"))
+                            .group_by(emotions.c.emotion)
+                            .order_by(desc("n"))
+                            .limit(5)
+                        )
+                        top_emotions = top_emotions_result.all()
                         
-                        if child_emotions:
-                            sorted_emotions = sorted(child_emotions.items(), key=lambda x: x[1], reverse=True)[:5]
-                            for emotion, count in sorted_emotions:
-                                report_text += f"• {emotion}: {count} раз\n"
+                        if top_emotions:
+                            for emotion, count in top_emotions:
+                                parts.append(f"• {emotion}: {count} раз\n")
                         else:
-                            report_text += "• Эмоций пока не обнаружено\n"
+                            parts.append("• Эмоций пока не обнаружено\n")
                             
-                        report_text += f"\n💡 <b>Наблюдения:</b>\n"
-                        if len(child_translations) >= 3:
-                            report_text += f"• Активное эмоциональное развитие у {child.name}!\n"
+                        parts.append(f"\n💡 <b>Наблюдения:</b>\n")
+                        if translation_count >= 3:
+                            parts.append(f"• Активное эмоциональное развитие у {child.name}!\n")
                         else:
-                            report_text += f"• Попробуйте чаще анализировать эмоции {child.name}\n"
+                            parts.append(f"• Попробуйте чаще анализировать эмоции {child.name}\n")
                         
-                        if child_emotions:
-                            top_emotion = max(child_emotions.items(), key=lambda x: x[1])
-                            report_text += f"• Доминирующая эмоция: {top_emotion[0]}\n"
+                        if top_emotions:
+                            parts.append(f"• Доминирующая эмоция: {top_emotions[0][0]}\n")
                     else:
-                        report_text += "• Анализов эмоций пока не проводилось\n"
-                        report_text += f"\n💡 <b>Рекомендация:</b>\n• Начните анализировать эмоции {child.name} для создания отчета\n"
+                        parts.append("• Анализов эмоций пока не проводилось\n")
+                        parts.append(f"\n💡 <b>Рекомендация:</b>\n• Начните анализировать эмоции {child.name} для создания отчета\n")
                 else:
-                    report_text += "• Анализов эмоций пока не проводилось\n"
-                    report_text += f"\n💡 <b>Рекомендация:</b>\n• Начните анализировать эмоции {child.name} для создания отчета\n"
+                    parts.append("• Анализов эмоций пока не проводилось\n")
+                    parts.append(f"\n💡 <b>Рекомендация:</b>\n• Начните анализировать эмоции {child.name} для создания отчета\n")
                 
-                report_text += f"\n🌟 <b>Рекомендации для {child.name}:</b>\n"
-                report_text += "• Продолжайте регулярные беседы об эмоциях\n"
-                report_text += f"• Учитывайте возрастные особенности ({child.age} лет)\n"
+                parts.append(f"\n🌟 <b>Рекомендации для {child.name}:</b>\n")
+                parts.append("• Продолжайте регулярные беседы об эмоциях\n")
+                parts.append(f"• Учитывайте возрастные особенности ({child.age} лет)\n")
                 if child.personality_traits:
-                    report_text += "• Помните об индивидуальных особенностях\n"
+                    parts.append("• Помните об индивидуальных особенностях\n")
+                
+                report_text = "".join(parts)
                 
         else:
             # Fallback when database is not available
-            report_text = f"""
-📊 <b>Отчет о ребенке: {child.name}</b>
-
-❌ <b>Сервис временно недоступен</b>
-
-К сожалению, сейчас не удается сгенерировать отчет из-за проблем с базой данных.
-
-Попробуйте позже.
-
-<i>Для генерации отчетов нужны данные об анализе эмоций.</i>
-"""
+            report_text = _REPORT_UNAVAILABLE_TEMPLATE.substitute(title=f"Отчет о ребенке: {child.name}")
         
         # Create keyboard with back button
         keyboard = [
@@ -1690,26 +1763,43 @@ async def handle_individual_child_report(query, bot, user, child_id):
         
     except Exception as e:
         logger.error(f"Error generating individual child report: {e}")
-        await query.edit_message_text(
-            text=f"❌ <b>Ошибка при генерации отчета</b>\n\nПопробуйте позже.",
-            reply_markup=InlineKeyboards.child_management(),
-            parse_mode="HTML"
-        )
+        await _send_error(query, "❌ <b>Ошибка при генерации отчета</b>\n\nПопробуйте позже.", InlineKeyboards.child_management())
+
+
+async def _weekly_report_html(bot, svc, user_id, weeks_back: int) -> str:
+    """Render a weekly report, reusing the copy cached in Redis when there is one."""
+    week_start = report_week_start(weeks_back)
+    if bot.cache_service:
+        try:
+            cached = await bot.cache_service.get_cached_weekly_report(user_id, week_start)
+            if cached:
+                return cached
+        except Exception as e:
+            logger.warning(f"Weekly report cache read failed: {e}")
+    
+    report_text = await svc.report.format_weekly_report(user_id, weeks_back=weeks_back)
+    
+    # Skip caching if a new week began while rendering; the report may then cover a different week
+    if (
+        bot.cache_service
+        and report_text != WEEKLY_REPORT_ERROR_HTML
+        and report_week_start(weeks_back) == week_start
+    ):
+        try:
+            await bot.cache_service.cache_weekly_report(user_id, week_start, report_text)
+        except Exception as e:
+            logger.warning(f"Weekly report cache write failed: {e}")
+    return report_text
 
 
 async def handle_view_reports(query, bot, user):
     """Handle weekly reports view."""
-    from src.core.localization.translator import _
-    
     try:
         # Generate weekly report
         if bot and bot.db_manager:
-            async with bot.db_manager.get_session() as session:
-                from src.core.services import ReportService
-                report_service = ReportService(session)
-                
+            async with bot.services() as svc:
                 # Get current week report
-                report_text = await report_service.format_weekly_report(user.id, weeks_back=0)
+                report_text = await _weekly_report_html(bot, svc, user.id, 0)
                 
                 # Create keyboard with options for different weeks
                 keyboard = InlineKeyboards.weekly_reports_navigation()
@@ -1724,17 +1814,7 @@ async def handle_view_reports(query, bot, user):
                 
         else:
             # Fallback when database is not available
-            report_text = f"""
-📊 <b>Еженедельные отчеты</b>
-
-❌ <b>Сервис временно недоступен</b>
-
-К сожалению, сейчас не удается сгенерировать отчет из-за проблем с базой данных.
-
-Попробуйте позже.
-
-<i>Для генерации отчетов нужны данные об анализе эмоций.</i>
-"""
+            report_text = _REPORT_UNAVAILABLE_TEMPLATE.substitute(title="Еженедельные отчеты")
             await query.edit_message_text(
                 text=report_text,
                 reply_markup=InlineKeyboards.main_menu(),
@@ -1743,25 +1823,16 @@ async def handle_view_reports(query, bot, user):
             
     except Exception as e:
         logger.error(f"Error in handle_view_reports: {e}")
-        await query.edit_message_text(
-            text=f"📊 <b>Еженедельные отчеты</b>\n\n❌ Произошла ошибка при генерации отчета.\n\nПопробуйте позже.",
-            reply_markup=InlineKeyboards.main_menu(),
-            parse_mode="HTML"
-        )
+        await _send_error(query, "📊 <b>Еженедельные отчеты</b>\n\n❌ Произошла ошибка при генерации отчета.\n\nПопробуйте позже.")
 
 
 async def handle_view_reports_week(query, bot, user, weeks_back):
     """Handle weekly reports for different weeks."""
-    from src.core.localization.translator import _
-    
     try:
         if bot and bot.db_manager:
-            async with bot.db_manager.get_session() as session:
-                from src.core.services import ReportService
-                report_service = ReportService(session)
-                
+            async with bot.services() as svc:
                 # Get report for specific week
-                report_text = await report_service.format_weekly_report(user.id, weeks_back=weeks_back)
+                report_text = await _weekly_report_html(bot, svc, user.id, weeks_back)
                 
                 # Create keyboard with navigation
                 keyboard = InlineKeyboards.weekly_reports_navigation_specific(weeks_back)
@@ -1781,11 +1852,7 @@ async def handle_view_reports_week(query, bot, user, weeks_back):
             
     except Exception as e:
         logger.error(f"Error in handle_view_reports_week: {e}")
-        await query.edit_message_text(
-            text="❌ Ошибка при генерации отчета",
-            reply_markup=InlineKeyboards.main_menu(),
-            parse_mode="HTML"
-        )
+        await _send_error(query, "❌ Ошибка при генерации отчета")
 
 
 async def handle_edit_child_start(query, bot, user):
@@ -1793,7 +1860,7 @@ async def handle_edit_child_start(query, bot, user):
     try:
         if not user.children:
             await query.edit_message_text(
-                text="👶 <b>Редактирование профиля ребенка</b>\n\nУ вас пока нет детей для редактирования.\n\nДобавьте ребенка сначала.",
+                text=_NO_CHILDREN_TO_EDIT_HTML,
                 reply_markup=InlineKeyboards.main_menu(),
                 parse_mode="HTML"
             )
@@ -1802,14 +1869,11 @@ async def handle_edit_child_start(query, bot, user):
         # Show list of children to edit
         text = "📝 <b>Редактировать профиль ребенка</b>\n\nВыберите ребенка, профиль которого хотите редактировать:"
         
-        keyboard_buttons = []
-        for child in user.children:
-            keyboard_buttons.append([
-                InlineKeyboardButton(f"👶 {child.name} ({child.age} лет)", 
-                                   callback_data=f"edit_child_{child.id}")
-            ])
-        
-        keyboard_buttons.append([InlineKeyboardButton("🔙 Назад", callback_data="manage_children")])
+        keyboard_buttons = [
+            [InlineKeyboardButton(f"👶 {child.display_label}", callback_data=f"edit_child_{child.id}")]
+            for child in user.children
+        ]
+        keyboard_buttons.append([_BACK_TO_MANAGE_CHILDREN])
         keyboard = InlineKeyboardMarkup(keyboard_buttons)
         
         await query.edit_message_text(
@@ -1820,11 +1884,7 @@ async def handle_edit_child_start(query, bot, user):
         
     except Exception as e:
         logger.error(f"Error in handle_edit_child_start: {e}")
-        await query.edit_message_text(
-            text="❌ Ошибка при выборе ребенка для редактирования",
-            reply_markup=InlineKeyboards.main_menu(),
-            parse_mode="HTML"
-        )
+        await _send_error(query, "❌ Ошибка при выборе ребенка для редактирования")
 
 
 async def handle_remove_child_start(query, bot, user):
@@ -1832,7 +1892,7 @@ async def handle_remove_child_start(query, bot, user):
     try:
         if not user.children:
             await query.edit_message_text(
-                text="👶 <b>Удалить профиль ребенка</b>\n\nУ вас пока нет детей для удаления.",
+                text=_NO_CHILDREN_TO_REMOVE_HTML,
                 reply_markup=InlineKeyboards.main_menu(),
                 parse_mode="HTML"
             )
@@ -1841,14 +1901,11 @@ async def handle_remove_child_start(query, bot, user):
         # Show list of children to remove
         text = "🗑️ <b>Удалить профиль ребенка</b>\n\n⚠️ <b>Внимание:</b> Удаление профиля ребенка также удалит все связанные с ним анализы эмоций и отчеты.\n\nВыберите ребенка, профиль которого хотите удалить:"
         
-        keyboard_buttons = []
-        for child in user.children:
-            keyboard_buttons.append([
-                InlineKeyboardButton(f"🗑️ {child.name} ({child.age} лет)", 
-                                   callback_data=f"remove_child_{child.id}")
-            ])
-        
-        keyboard_buttons.append([InlineKeyboardButton("🔙 Назад", callback_data="manage_children")])
+        keyboard_buttons = [
+            [InlineKeyboardButton(f"🗑️ {child.display_label}", callback_data=f"remove_child_{child.id}")]
+            for child in user.children
+        ]
+        keyboard_buttons.append([_BACK_TO_MANAGE_CHILDREN])
         keyboard = InlineKeyboardMarkup(keyboard_buttons)
         
         await query.edit_message_text(
@@ -1859,25 +1916,14 @@ async def handle_remove_child_start(query, bot, user):
         
     except Exception as e:
         logger.error(f"Error in handle_remove_child_start: {e}")
-        await query.edit_message_text(
-            text="❌ Ошибка при выборе ребенка для удаления",
-            reply_markup=InlineKeyboards.main_menu(),
-            parse_mode="HTML"
-        )
+        await _send_error(query, "❌ Ошибка при выборе ребенка для удаления")
 
 
-async def handle_edit_specific_child(query, bot, user, child_id):
+async def handle_edit_specific_child(query, bot, user, child_uuid: UUID):
     """Handle editing a specific child's profile."""
     try:
-        from uuid import UUID
-        child_uuid = UUID(child_id)
-        
         # Find the child
-        child = None
-        for c in user.children:
-            if c.id == child_uuid:
-                child = c
-                break
+        child = user.get_child(child_uuid)
         
         if not child:
             await query.edit_message_text(
@@ -1893,11 +1939,11 @@ async def handle_edit_specific_child(query, bot, user, child_id):
         text = f"📝 <b>Редактирование профиля</b>\n\n{profile_text}\n\n<b>Что хотите изменить?</b>"
         
         keyboard_buttons = [
-            [InlineKeyboardButton("📝 Имя", callback_data=f"edit_name_{child_id}")],
-            [InlineKeyboardButton("🎂 Возраст", callback_data=f"edit_age_{child_id}")],
-            [InlineKeyboardButton("🌟 Характер", callback_data=f"edit_personality_{child_id}")],
-            [InlineKeyboardButton("🎨 Интересы", callback_data=f"edit_interests_{child_id}")],
-            [InlineKeyboardButton("🔍 Особые потребности", callback_data=f"edit_special_{child_id}")],
+            [InlineKeyboardButton("📝 Имя", callback_data=f"edit_name_{child_uuid}")],
+            [InlineKeyboardButton("🎂 Возраст", callback_data=f"edit_age_{child_uuid}")],
+            [InlineKeyboardButton("🌟 Характер", callback_data=f"edit_personality_{child_uuid}")],
+            [InlineKeyboardButton("🎨 Интересы", callback_data=f"edit_interests_{child_uuid}")],
+            [InlineKeyboardButton("🔍 Особые потребности", callback_data=f"edit_special_{child_uuid}")],
             [InlineKeyboardButton("🔙 Назад", callback_data="edit_child")]
         ]
         keyboard = InlineKeyboardMarkup(keyboard_buttons)
@@ -1910,25 +1956,14 @@ async def handle_edit_specific_child(query, bot, user, child_id):
         
     except Exception as e:
         logger.error(f"Error in handle_edit_specific_child: {e}")
-        await query.edit_message_text(
-            text="❌ Ошибка при загрузке профиля ребенка",
-            reply_markup=InlineKeyboards.main_menu(),
-            parse_mode="HTML"
-        )
+        await _send_error(query, "❌ Ошибка при загрузке профиля ребенка")
 
 
-async def handle_remove_specific_child_confirm(query, bot, user, child_id):
+async def handle_remove_specific_child_confirm(query, bot, user, child_uuid: UUID):
     """Show confirmation dialog for removing a specific child."""
     try:
-        from uuid import UUID
-        child_uuid = UUID(child_id)
-        
         # Find the child
-        child = None
-        for c in user.children:
-            if c.id == child_uuid:
-                child = c
-                break
+        child = user.get_child(child_uuid)
         
         if not child:
             await query.edit_message_text(
@@ -1938,16 +1973,10 @@ async def handle_remove_specific_child_confirm(query, bot, user, child_id):
             )
             return
         
-        text = f"⚠️ <b>Подтвердите удаление</b>\n\n"
-        text += f"Вы действительно хотите удалить профиль <b>{child.name}</b>?\n\n"
-        text += f"<b>Это действие:</b>\n"
-        text += f"• Удалит профиль ребенка навсегда\n"
-        text += f"• Удалит все анализы эмоций для {child.name}\n" 
-        text += f"• Удалит все отчеты для {child.name}\n\n"
-        text += f"<b>Восстановление будет невозможно!</b>"
+        text = _REMOVE_CHILD_CONFIRM_TEMPLATE.substitute(name=child.name)
         
         keyboard_buttons = [
-            [InlineKeyboardButton("❌ Да, удалить", callback_data=f"confirm_remove_{child_id}")],
+            [InlineKeyboardButton("❌ Да, удалить", callback_data=f"confirm_remove_{child_uuid}")],
             [InlineKeyboardButton("✅ Нет, отменить", callback_data="remove_child")]
         ]
         keyboard = InlineKeyboardMarkup(keyboard_buttons)
@@ -1960,25 +1989,14 @@ async def handle_remove_specific_child_confirm(query, bot, user, child_id):
         
     except Exception as e:
         logger.error(f"Error in handle_remove_specific_child_confirm: {e}")
-        await query.edit_message_text(
-            text="❌ Ошибка при подготовке удаления",
-            reply_markup=InlineKeyboards.main_menu(),
-            parse_mode="HTML"
-        )
+        await _send_error(query, "❌ Ошибка при подготовке удаления")
 
 
-async def handle_confirm_remove_child(query, bot, user, child_id):
+async def handle_confirm_remove_child(query, bot, user, child_uuid: UUID):
     """Actually remove the child from database."""
     try:
-        from uuid import UUID
-        child_uuid = UUID(child_id)
-        
         # Find the child
-        child = None
-        for c in user.children:
-            if c.id == child_uuid:
-                child = c
-                break
+        child = user.get_child(child_uuid)
         
         if not child:
             await query.edit_message_text(
@@ -1992,24 +2010,19 @@ async def handle_confirm_remove_child(query, bot, user, child_id):
         
         # Remove child from database
         if bot and bot.db_manager:
-            async with bot.db_manager.get_session() as session:
-                from src.core.services import FamilyService, UserService
-                family_service = FamilyService(session)
-                user_service = UserService(session)
-                
-                # This will also cascade delete all related emotion translations
-                await family_service.remove_child(child_uuid, user.id)
-                await session.commit()
+            async with bot.services() as svc:
+                # Deletes and commits; the cascade also removes related emotion translations
+                await svc.family.remove_child(child_uuid, user.id)
+                bot.forget_user(user.telegram_id)
+                if bot.cache_service:
+                    bot.run_in_background(bot.cache_service.invalidate_child_analyses(child_uuid))
+                    # The cascade removes the child's translations from every past week too
+                    bot.run_in_background(bot.cache_service.invalidate_weekly_reports(user.id))
                 
-                # Get fresh user from database instead of refreshing old object
-                fresh_user = await user_service.get_user_by_id(user.id)
-                if fresh_user:
-                    # Update the user's children list locally
-                    user.children = fresh_user.children
+                # Exactly one child went away; drop it locally instead of reloading the user
+                user.children = [c for c in user.children if c.id != child_uuid]
                 
-            text = f"✅ <b>Профиль удален</b>\n\n"
-            text += f"Профиль <b>{child_name}</b> и все связанные данные успешно удалены.\n\n"
-            text += f"Что хотите сделать дальше?"
+            text = _CHILD_REMOVED_TEMPLATE.substitute(name=child_name)
             
             await query.edit_message_text(
                 text=text,
@@ -2025,11 +2038,184 @@ async def handle_confirm_remove_child(query, bot, user, child_id):
         
     except Exception as e:
         logger.error(f"Error in handle_confirm_remove_child: {e}")
-        await query.edit_message_text(
-            text="❌ Ошибка при удалении профиля ребенка",
-            reply_markup=InlineKeyboards.main_menu(),
-            parse_mode="HTML"
-        )
+        await _send_error(query, "❌ Ошибка при удалении профиля ребенка")
+
+
+async def _send_error(query, text: str, keyboard: Optional[InlineKeyboardMarkup] = None):
+    """Replace a callback's message with an error notice; the main menu is the default way back."""
+    await query.edit_message_text(
+        text=text,
+        reply_markup=keyboard or InlineKeyboards.main_menu(),
+        parse_mode="HTML"
+    )
+
+
+# Callback dispatch. Exact-match handlers take (query, bot, user); prefix
+# handlers additionally receive the callback data after the prefix.
+
+async def _show_main_menu(query, bot, user):
+    """Show the main menu."""
+    await _edit_if_changed(
+        query,
+        bot,
+        f"👋 <b>{_('common.welcome')}, {query.from_user.first_name}!</b>\n\nЧто вы хотели бы сделать сегодня?",
+        InlineKeyboards.main_menu()
+    )
+
+
+async def _show_manage_children(query, bot, user):
+    """Show the child management placeholder menu."""
+    await _edit_if_changed(
+        query,
+        bot,
+        f"👶 <b>Управление детьми</b>\n\nУправляйте профилями ваших детей для персонализированного анализа эмоций.\n\n<i>Функция скоро появится...</i>",
+        InlineKeyboards.child_management()
+    )
+
+
+async def _show_help(query, bot, user):
+    """Show the help menu."""
+    await _edit_if_changed(
+        query,
+        bot,
+        f"❓ <b>Помощь и поддержка</b>\n\nПолучите помощь по использованию Family Emotions App.\n\n<i>Полная система помощи скоро появится...</i>",
+        InlineKeyboards.help_menu()
+    )
+
+
+async def _show_settings(query, bot, user):
+    """Show the settings placeholder menu."""
+    await _edit_if_changed(
+        query,
+        bot,
+        f"⚙️ <b>{_('settings.title')}</b>\n\nНастройте предпочтения приложения.\n\n<i>Панель настроек скоро появится...</i>",
+        InlineKeyboards.main_menu()
+    )
+
+
+async def _start_emotion_translate(query, bot, user):
+    """Start the emotion translation flow."""
+    # Start emotion translation flow - first select child
+    user_context = bot.get_user_context(query.from_user.id)
+    await handle_emotion_translate_start(query, bot, user, user_context)
+
+
+async def _start_add_child(query, bot, user):
+    """Prompt for a new child's name."""
+    await query.edit_message_text(
+        text="👶 <b>Add New Child</b>\n\nWhat is your child's name?\n\n<i>Please type the name below:</i>",
+        parse_mode="HTML"
+    )
+    
+    # Set conversation state for this user
+    if bot:
+        user_context = bot.get_user_context(query.from_user.id)
+        user_context.set_state(ConversationStates.ADD_CHILD_NAME)
+
+
+async def _select_child_for_translation(query, bot, user, child_id):
+    """Select a child for emotion translation."""
+    user_context = bot.get_user_context(query.from_user.id)
+    await handle_child_selection_for_translation(query, bot, user, user_context, child_id)
+
+
+async def _view_reports_week(query, bot, user, weeks_back):
+    """Show the report for a past week; rapid week-to-week clicks render only the last one."""
+    bot.debounce(
+        ("report_nav", query.message.chat_id),
+        lambda: handle_view_reports_week(query, bot, user, int(weeks_back)),
+        settings.telegram.navigation_debounce
+    )
+
+
+async def _skip_optional_step(update, bot, user, step):
+    """Treat the "Skip" button like a typed "skip", but only for the step that offered it."""
+    user_context = bot.get_user_context(update.effective_user.id)
+    state = user_context.current_state
+    if state not in _SKIPPABLE_STATES or state.name.lower() != step:
+        # A stale button from an earlier step must not skip whatever is asked now
+        return
+    
+    await _STATE_HANDLERS[state](update, bot, user, user_context, "skip")
+
+
+_CALLBACK_DISPATCH = {
+    "main_menu": _show_main_menu,
+    "manage_children": _show_manage_children,
+    "help": _show_help,
+    "settings": _show_settings,
+    "emotion_translate": _start_emotion_translate,
+    "view_reports": handle_view_reports,
+    "manage_family": handle_family_management,
+    "add_child": _start_add_child,
+    "child_reports": handle_child_reports,
+    "family_list": handle_family_list,
+    "family_add": handle_family_add_start,
+    "family_permissions": handle_family_permissions,
+    "family_remove": handle_family_remove,
+    "edit_child": handle_edit_child_start,
+    "remove_child": handle_remove_child_start,
+}
+
+# Static screens that render from query.from_user alone and skip the user lookup
+_USER_OPTIONAL_CALLBACKS = frozenset({
+    "main_menu",
+    "manage_children",
+    "help",
+    "settings",
+    "add_child",
+})
+
+# Callbacks of the form "<action>_<id>", matched in one pass by _CALLBACK_ID_RE
+_PREFIX_DISPATCH = {
+    "report_week": _view_reports_week,
+    "child_report": handle_individual_child_report,
+    "translate_child": _select_child_for_translation,
+    "edit_child": handle_edit_specific_child,
+    "remove_child": handle_remove_specific_child_confirm,
+    "confirm_remove": handle_confirm_remove_child,
+    "skip_optional": _skip_optional_step,
+}
+
+_CALLBACK_ID_RE = re.compile(r"^(%s)_(.+)$" % "|".join(_PREFIX_DISPATCH))
+
+# Prefixed callbacks whose id is a child UUID; the dispatcher validates and parses it once
+_CHILD_ID_CALLBACKS = frozenset({
+    "child_report",
+    "translate_child",
+    "edit_child",
+    "remove_child",
+    "confirm_remove",
+})
+
+# Prefixed callbacks whose handler takes the whole Update instead of the query,
+# so they can reuse the text-message step handlers
+_UPDATE_CALLBACKS = frozenset({
+    "skip_optional",
+})
+
+_CHILD_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+# Text-message handlers keyed by conversation state; all share the
+# (update, bot, user, user_context, message_text) signature
+_STATE_HANDLERS = {
+    ConversationStates.ADD_CHILD_NAME: handle_add_child_name,
+    ConversationStates.ADD_CHILD_AGE: handle_add_child_age,
+    ConversationStates.ADD_CHILD_PERSONALITY: handle_add_child_personality,
+    ConversationStates.ADD_CHILD_INTERESTS: handle_add_child_interests,
+    ConversationStates.ADD_CHILD_SPECIAL_NEEDS: handle_add_child_special_needs,
+    ConversationStates.EMOTION_TRANSLATE_INPUT: handle_emotion_translate_input,
+    ConversationStates.EMOTION_ENTER_MESSAGE: handle_emotion_message_input,
+    ConversationStates.EMOTION_ADD_CONTEXT: handle_emotion_context_input,
+}
+
+# Wizard steps whose "Skip" button (InlineKeyboards.skip_optional) may be honoured
+_SKIPPABLE_STATES = frozenset({
+    ConversationStates.ADD_CHILD_PERSONALITY,
+    ConversationStates.ADD_CHILD_INTERESTS,
+    ConversationStates.ADD_CHILD_SPECIAL_NEEDS,
+})
 
 
 def setup_handlers(app_or_bot):
@@ -1,15 +1,93 @@
 """Inline keyboards for Telegram bot."""
-from typing import List, Optional, Tuple
+from functools import lru_cache, wraps
+from typing import Callable, Dict, List, Optional, Tuple
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+from .states import ConversationStates
 from ...core.models.user import Children, UserRole
-from ...core.localization import _
+from ...core.localization import _, Language, get_language
+
+
+def _cached_per_language(factory: Callable[[], InlineKeyboardMarkup]) -> Callable[[], InlineKeyboardMarkup]:
+    """Build a static keyboard once per interface language and reuse the markup."""
+    cache: Dict[Language, InlineKeyboardMarkup] = {}
+    
+    @wraps(factory)
+    def wrapper() -> InlineKeyboardMarkup:
+        language = get_language()
+        markup = cache.get(language)
+        if markup is None:
+            markup = cache[language] = factory()
+        return markup
+    
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+@lru_cache(maxsize=256)
+def _children_list_markup(
+    children: Tuple[Tuple[str, str, int], ...],
+    action: str,
+    language: Language
+) -> InlineKeyboardMarkup:
+    """Build a children keyboard for an (id, name, age) roster; cached per roster, action and language."""
+    years = _('common.years')
+    keyboard = [
+        [InlineKeyboardButton(f"👶 {name} ({age} {years})", callback_data=f"{action}_child_{child_id}")]
+        for child_id, name, age in children
+    ]
+    
+    keyboard.append([
+        InlineKeyboardButton(_('buttons.back'), callback_data="manage_children")
+    ])
+    
+    return InlineKeyboardMarkup(keyboard)
+
+
+@lru_cache(maxsize=128)
+def _confirmation_markup(confirm_action: str, cancel_action: str, language: Language) -> InlineKeyboardMarkup:
+    """Build a confirm/cancel keyboard; cached per action pair and language."""
+    keyboard = [
+        [
+            InlineKeyboardButton(_('buttons.confirm'), callback_data=confirm_action),
+            InlineKeyboardButton(_('buttons.cancel'), callback_data=cancel_action)
+        ]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+@lru_cache(maxsize=32)
+def _skip_optional_markup(step: ConversationStates, language: Language) -> InlineKeyboardMarkup:
+    """Build the skip/back keyboard for one optional wizard step; cached per step and language."""
+    keyboard = [
+        [
+            InlineKeyboardButton(_('buttons.skip'), callback_data=f"skip_optional_{step.name.lower()}"),
+            InlineKeyboardButton(_('buttons.back'), callback_data="back")
+        ]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+@lru_cache(maxsize=256)
+def _response_options_markup(titles: Tuple[str, ...]) -> InlineKeyboardMarkup:
+    """Build a response-option keyboard; cached per tuple of option titles."""
+    keyboard = [
+        [InlineKeyboardButton(f"💡 {title}", callback_data=f"response_option_{i}")]
+        for i, title in enumerate(titles)
+    ]
+    
+    keyboard.append([
+        InlineKeyboardButton("🔙 К результатам", callback_data="back_to_results")
+    ])
+    
+    return InlineKeyboardMarkup(keyboard)
 
 
 class InlineKeyboards:
     """Factory class for creating inline keyboards."""
     
     @staticmethod
+    @_cached_per_language
     def main_menu() -> InlineKeyboardMarkup:
         """Create main menu keyboard."""
         keyboard = [
@@ -29,6 +107,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @_cached_per_language
     def child_management() -> InlineKeyboardMarkup:
         """Create child management keyboard."""
         keyboard = [
@@ -49,23 +128,11 @@ class InlineKeyboards:
     @staticmethod
     def children_list(children: List[Children], action: str = "select") -> InlineKeyboardMarkup:
         """Create keyboard with list of children."""
-        keyboard = []
-        
-        for child in children:
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"👶 {child.name} ({child.age} {_('common.years')})", 
-                    callback_data=f"{action}_child_{child.id}"
-                )
-            ])
-        
-        keyboard.append([
-            InlineKeyboardButton(_('buttons.back'), callback_data="manage_children")
-        ])
-        
-        return InlineKeyboardMarkup(keyboard)
+        roster = tuple((str(child.id), child.name, child.age) for child in children)
+        return _children_list_markup(roster, action, get_language())
     
     @staticmethod
+    @_cached_per_language
     def emotion_translation_options() -> InlineKeyboardMarkup:
         """Create options for emotion translation."""
         keyboard = [
@@ -100,23 +167,10 @@ class InlineKeyboards:
     @staticmethod
     def response_options(responses: List[dict]) -> InlineKeyboardMarkup:
         """Create keyboard for response options."""
-        keyboard = []
-        
-        for i, response in enumerate(responses):
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"💡 {response['title']}", 
-                    callback_data=f"response_option_{i}"
-                )
-            ])
-        
-        keyboard.append([
-            InlineKeyboardButton("🔙 К результатам", callback_data="back_to_results")
-        ])
-        
-        return InlineKeyboardMarkup(keyboard)
+        return _response_options_markup(tuple(response['title'] for response in responses))
     
     @staticmethod
+    @_cached_per_language
     def settings_menu() -> InlineKeyboardMarkup:
         """Create settings menu keyboard."""
         keyboard = [
@@ -139,6 +193,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def language_selection() -> InlineKeyboardMarkup:
         """Create language selection keyboard."""
         keyboard = [
@@ -163,15 +218,10 @@ class InlineKeyboards:
     @staticmethod
     def confirmation(confirm_action: str, cancel_action: str = "main_menu") -> InlineKeyboardMarkup:
         """Create confirmation keyboard."""
-        keyboard = [
-            [
-                InlineKeyboardButton(_('buttons.confirm'), callback_data=confirm_action),
-                InlineKeyboardButton(_('buttons.cancel'), callback_data=cancel_action)
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return _confirmation_markup(confirm_action, cancel_action, get_language())
     
     @staticmethod
+    @_cached_per_language
     def family_management() -> InlineKeyboardMarkup:
         """Create family management keyboard."""
         keyboard = [
@@ -190,6 +240,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @_cached_per_language
     def user_role_selection() -> InlineKeyboardMarkup:
         """Create user role selection keyboard."""
         keyboard = [
@@ -204,6 +255,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @_cached_per_language
     def reports_menu() -> InlineKeyboardMarkup:
         """Create reports menu keyboard."""
         keyboard = [
@@ -226,6 +278,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @_cached_per_language
     def weekly_reports_navigation() -> InlineKeyboardMarkup:
         """Create weekly reports navigation keyboard."""
         keyboard = [
@@ -264,6 +317,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @_cached_per_language
     def help_menu() -> InlineKeyboardMarkup:
         """Create help menu keyboard."""
         keyboard = [
@@ -286,6 +340,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @_cached_per_language
     def subscription_options() -> InlineKeyboardMarkup:
         """Create subscription options keyboard."""
         keyboard = [
@@ -304,6 +359,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def checkin_response_scale() -> InlineKeyboardMarkup:
         """Create mood scale for check-in responses."""
         keyboard = [
@@ -318,6 +374,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def gender_selection() -> InlineKeyboardMarkup:
         """Create gender selection keyboard for child registration."""
         keyboard = [
@@ -333,12 +390,6 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
-    def skip_optional() -> InlineKeyboardMarkup:
-        """Create skip button for optional fields."""
-        keyboard = [
-            [
-                InlineKeyboardButton(_('buttons.skip'), callback_data="skip_optional"),
-                InlineKeyboardButton(_('buttons.back'), callback_data="back")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
\ No newline at end of file
+    def skip_optional(step: ConversationStates) -> InlineKeyboardMarkup:
+        """Create skip button for the optional field asked at the given wizard step."""
+        return _skip_optional_markup(step, get_language())
\ No newline at end of file
@@ -1,18 +1,23 @@
 """Message templates for the Telegram bot."""
 
 from typing import Optional, List, Dict, Any
-from dataclasses import dataclass
-from ...core.localization import _
+from functools import lru_cache
+from ...core.localization import _, Language, get_language
+
+
+@lru_cache(maxsize=None)
+def _welcome_text(language: Language) -> str:
+    """Join the welcome title and description once per interface language."""
+    return _('welcome.title', language) + "\n\n" + _('welcome.description', language)
 
 
-@dataclass
 class Messages:
     """Bot message templates."""
     
     # Welcome & Onboarding - Now using localization
     @property
     def WELCOME(self):
-        return _('welcome.title') + "\n\n" + _('welcome.description')
+        return _welcome_text(get_language())
     
     def ONBOARDING_NAME_RECEIVED(self, name: str):
         return f"Приятно познакомиться, {name}!\n\nРасскажите о ваших детях. Сколько у вас детей?"
@@ -23,9 +28,7 @@ class Messages:
     def ONBOARDING_CHILD_AGE(self, name: str):
         return f"Сколько лет {name}?"
     
-    @property
-    def ONBOARDING_PROBLEMS(self):
-        return "Отлично! Теперь выберите области, где чаще всего возникают сложности:\n\nВыберите одну или несколько областей из списка ниже."
+    ONBOARDING_PROBLEMS = "Отлично! Теперь выберите области, где чаще всего возникают сложности:\n\nВыберите одну или несколько областей из списка ниже."
     
     def ONBOARDING_COMPLETE(self, name: str, children_info: str):
         return f"✅ Спасибо, {name}!\n\nТеперь я знаю вашу семью:\n{children_info}\n\nЯ буду учитывать эту информацию в своих советах.\n\nГотовы начать? Выберите, что вы хотите сделать:"
\ No newline at end of file
@@ -1,8 +1,8 @@
 """Conversation states for Telegram bot."""
-from enum import Enum, auto
+from enum import IntEnum, auto
 
 
-class ConversationStates(Enum):
+class ConversationStates(IntEnum):
     """Conversation states for bot interactions."""
     
     # Main menu navigation
@@ -35,6 +35,7 @@ class ConversationStates(Enum):
     EMOTION_ADD_CONTEXT = auto()
     EMOTION_PROCESSING = auto()
     EMOTION_SHOW_RESULTS = auto()
+    EMOTION_TRANSLATE_INPUT = auto()
     
     # Settings management
     SETTINGS_MENU = auto()
@@ -70,12 +71,22 @@ class ConversationStates(Enum):
 class UserContext:
     """Context data for user conversations."""
     
+    __slots__ = (
+        "current_state",
+        "temp_data",
+        "selected_child_id",
+        "current_translation_id",
+        "session_id",
+        "last_active",
+    )
+    
     def __init__(self):
         self.current_state: ConversationStates = ConversationStates.MAIN_MENU
         self.temp_data: dict = {}
         self.selected_child_id: str = None
         self.current_translation_id: str = None
         self.session_id: str = None
+        self.last_active: float = 0.0
         
     def clear(self):
         """Clear temporary data while keeping session info."""
@@ -83,12 +94,9 @@ class UserContext:
         self.selected_child_id = None
         self.current_translation_id = None
     
-    def set_state(self, state):
+    def set_state(self, state: ConversationStates):
         """Set current conversation state."""
-        if isinstance(state, str):
-            self.current_state = state
-        else:
-            self.current_state = state
+        self.current_state = state
     
     def get_temp_data(self, key: str, default=None):
         """Get temporary data by key."""
@@ -5,6 +5,13 @@ from typing import Optional, Tuple
 from datetime import datetime
 from ...core.localization import _
 
+# Patterns compiled once at import instead of going through re's cache per call
+_NAME_RE = re.compile(r'^[а-яА-ЯёЁa-zA-Z\s\-\']+$')
+_WHITESPACE_RE = re.compile(r'\s+')
+_UNSAFE_CHARS_RE = re.compile(r'[^\w\s\u0430-\u044f\u0410-\u042f\u0451\u0401.,!?;:()\"\'-]')
+_UNSAFE_ASCII_CHARS_RE = re.compile(r'[^\w\s.,!?;:()\"\'-]')
+_NON_LETTER_RE = re.compile(r'[^a-zA-Z\u0430-\u044f\u0410-\u042f\u0451\u0401]+')
+
 
 class InputValidator:
     """Validates user input."""
@@ -20,19 +27,22 @@ class InputValidator:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        if not name or not name.strip():
+        name = name.strip() if name else ''
+        if not name:
             return False, _('validation.name_required')
         
-        name = name.strip()
-        
         if len(name) < 2:
             return False, "Имя слишком короткое (минимум 2 символа)"
         
         if len(name) > 50:
             return False, "Имя слишком длинное (максимум 50 символов)"
         
+        # Single-word Latin names are exactly ASCII letters; skip the regex for them
+        if name.isascii() and name.isalpha():
+            return True, None
+        
         # Check for valid characters (Cyrillic, Latin letters, spaces, hyphens)
-        if not re.match(r'^[а-яА-ЯёЁa-zA-Z\s\-\']+$', name):
+        if not _NAME_RE.match(name):
             return False, _('validation.name_invalid')
         
         return True, None
@@ -49,8 +59,8 @@ class InputValidator:
             Tuple of (is_valid, error_message)
         """
         try:
-            age = int(age_str.strip())
-        except (ValueError, AttributeError):
+            age = int(age_str)
+        except (ValueError, TypeError):
             return False, _('validation.age_number')
         
         if age < 0:
@@ -72,11 +82,10 @@ class InputValidator:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        if not description or not description.strip():
+        description = description.strip() if description else ''
+        if not description:
             return False, _('validation.message_required')
         
-        description = description.strip()
-        
         if len(description) < 10:
             return False, "Описание слишком короткое. Пожалуйста, будьте более подробными."
         
@@ -100,10 +109,11 @@ class InputValidator:
             return text
             
         # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
+        text = _WHITESPACE_RE.sub(' ', text.strip())
         
         # Remove potentially harmful characters but keep Cyrillic
-        text = re.sub(r'[^\w\s\u0430-\u044f\u0410-\u042f\u0451\u0401.,!?;:()\"\'-]', '', text)
+        unsafe_chars = _UNSAFE_ASCII_CHARS_RE if text.isascii() else _UNSAFE_CHARS_RE
+        text = unsafe_chars.sub('', text)
         
         return text
     
@@ -118,19 +128,16 @@ class InputValidator:
         Returns:
             'ru' for Russian, 'other' for other languages
         """
-        if not text:
+        if not text or text.isascii():
             return 'other'
         
-        # Count Cyrillic characters
-        cyrillic_count = len(re.findall(r'[\u0430-\u044f\u0410-\u042f\u0451\u0401]', text))
-        total_letters = len(re.findall(r'[a-zA-Z\u0430-\u044f\u0410-\u042f\u0451\u0401]', text))
+        # One scan keeps only Latin and Cyrillic letters; the Latin ones are exactly the ASCII ones
+        letters = _NON_LETTER_RE.sub('', text)
+        total_letters = len(letters)
+        cyrillic_count = total_letters - len(letters.encode('ascii', 'ignore'))
         
-        if total_letters == 0:
-            return 'other'
-            
-        cyrillic_ratio = cyrillic_count / total_letters
-        
-        return 'ru' if cyrillic_ratio > 0.5 else 'other'
+        # More than half Cyrillic; also 'other' when there are no letters at all
+        return 'ru' if cyrillic_count * 2 > total_letters else 'other'
     
     @staticmethod
     def validate_personality_traits(traits: str) -> Tuple[bool, Optional[str]]:
@@ -143,11 +150,10 @@ class InputValidator:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        if not traits or not traits.strip():
+        traits = traits.strip() if traits else ''
+        if not traits:
             return True, None  # Optional field
         
-        traits = traits.strip()
-        
         if len(traits) > 500:
             return False, "Описание характера слишком длинное (максимум 500 символов)."
         
@@ -8,29 +8,49 @@ import sys
 from contextlib import asynccontextmanager
 from typing import Optional
 
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
 from core.config import settings
 from core.logging import setup_logging, get_logger
 from core.container import container
 
 
-# Setup logging first
-setup_logging()
 logger = get_logger("main")
 
+# Set once logging handlers and log files exist; importing this module must not create them
+_logging_configured = False
+
+
+def _ensure_logging() -> None:
+    """Configure logging on first use instead of at import time."""
+    global _logging_configured
+    if not _logging_configured:
+        setup_logging()
+        _logging_configured = True
+
+
+# Upper bound on waiting for pools to close during shutdown, in seconds
+CLEANUP_TIMEOUT = 10.0
+
 
 class FamilyEmotionsApp:
     """Main application class."""
     
     def __init__(self):
+        _ensure_logging()
         self.container = container
         self._shutdown_event = asyncio.Event()
         self._running = False
+        self._stop_task: Optional[asyncio.Task] = None
     
     async def initialize(self):
         """Initialize the application."""
-        logger.info(f"Initializing Family Emotions App v{settings.app_version}")
-        logger.info(f"Environment: {settings.environment}")
-        logger.info(f"Debug mode: {settings.debug}")
+        logger.info("Initializing Family Emotions App v%s", settings.app_version)
+        logger.info("Environment: %s", settings.environment)
+        logger.info("Debug mode: %s", settings.debug)
         
         try:
             # Initialize container with all services
@@ -44,7 +64,7 @@ class FamilyEmotionsApp:
             logger.info("Application initialized successfully")
             
         except Exception as e:
-            logger.error(f"Failed to initialize application: {e}")
+            logger.error("Failed to initialize application: %s", e)
             raise
     
     async def start(self):
@@ -73,48 +93,68 @@ class FamilyEmotionsApp:
                 await self.container.bot.run_polling()
             
         except Exception as e:
-            logger.error(f"Failed to start application: {e}")
+            logger.error("Failed to start application: %s", e)
             self._running = False
             raise
     
     async def stop(self):
-        """Stop the application gracefully."""
-        if not self._running:
+        """Stop the application gracefully; later calls are no-ops."""
+        if self._shutdown_event.is_set():
             return
+        self._shutdown_event.set()
         
         logger.info("Stopping Family Emotions App...")
         
         try:
             self._running = False
-            self._shutdown_event.set()
             
-            # Stop all services
-            await self.container.cleanup()
+            # Stop all services; shielded so cancelling stop() cannot leave pools half-closed
+            try:
+                await asyncio.wait_for(asyncio.shield(self.container.cleanup()), CLEANUP_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("Container cleanup did not finish within %ss", CLEANUP_TIMEOUT)
             
             logger.info("Application stopped successfully")
             
         except Exception as e:
-            logger.error(f"Error during shutdown: {e}")
+            logger.error("Error during shutdown: %s", e)
     
     def setup_signal_handlers(self):
-        """Setup signal handlers for graceful shutdown."""
-        def signal_handler(signum, frame):
-            logger.info(f"Received signal {signum}, initiating graceful shutdown...")
-            asyncio.create_task(self.stop())
+        """Setup signal handlers for graceful shutdown; must run inside the event loop."""
+        loop = asyncio.get_running_loop()
         
-        # Handle SIGTERM and SIGINT
-        signal.signal(signal.SIGTERM, signal_handler)
-        signal.signal(signal.SIGINT, signal_handler)
+        def signal_handler(signum):
+            logger.info("Received signal %s, initiating graceful shutdown...", signum)
+            self._stop_task = loop.create_task(self.stop())
         
-        # Handle SIGUSR1 for log rotation
-        def log_rotation_handler(signum, frame):
+        # Handle SIGTERM and SIGINT on the loop rather than between arbitrary bytecodes
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, signal_handler, signum)
+        
+        # Handle SIGUSR1 for log rotation; the app configured logging on creation, so find rotating handlers once
+        rotating_handlers = [
+            handler for handler in logging.root.handlers if hasattr(handler, 'doRollover')
+        ]
+        
+        def log_rotation_handler():
             logger.info("Received SIGUSR1, rotating logs...")
             # Force log rotation
-            for handler in logging.root.handlers:
-                if hasattr(handler, 'doRollover'):
-                    handler.doRollover()
+            for handler in rotating_handlers:
+                handler.doRollover()
         
-        signal.signal(signal.SIGUSR1, log_rotation_handler)
+        loop.add_signal_handler(signal.SIGUSR1, log_rotation_handler)
+    
+    async def __aenter__(self) -> FamilyEmotionsApp:
+        # __aexit__ does not run when __aenter__ raises, so release a partly built container here
+        try:
+            await self.initialize()
+        except BaseException:
+            await self.stop()
+            raise
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
     
     @property
     def is_running(self) -> bool:
@@ -124,85 +164,70 @@ class FamilyEmotionsApp:
 
 async def run_development_server():
     """Run the application in development mode."""
-    app = FamilyEmotionsApp()
-    
     try:
-        # Initialize application
-        await app.initialize()
-        
-        # Setup signal handlers
-        app.setup_signal_handlers()
-        
-        # Start application
-        await app.start()
+        async with FamilyEmotionsApp() as app:
+            # Setup signal handlers
+            app.setup_signal_handlers()
+            
+            # Start application
+            await app.start()
         
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt")
     except Exception as e:
-        logger.error(f"Application error: {e}")
+        logger.error("Application error: %s", e)
         sys.exit(1)
-    finally:
-        await app.stop()
 
 
 async def run_production_server():
     """Run the application in production mode with proper error handling."""
-    app = FamilyEmotionsApp()
-    
     try:
-        # Initialize application
-        await app.initialize()
-        
-        # Setup signal handlers
-        app.setup_signal_handlers()
-        
-        # Health check endpoint could be added here
-        logger.info("Application health check: OK")
-        
-        # Start application
-        await app.start()
+        async with FamilyEmotionsApp() as app:
+            # Setup signal handlers
+            app.setup_signal_handlers()
+            
+            # Health check endpoint could be added here
+            logger.info("Application health check: OK")
+            
+            # Start application
+            await app.start()
         
     except Exception as e:
-        logger.critical(f"Critical application error: {e}")
+        logger.critical("Critical application error: %s", e)
         sys.exit(1)
-    finally:
-        await app.stop()
 
 
 @asynccontextmanager
 async def lifespan_context():
     """Context manager for application lifespan."""
-    app = FamilyEmotionsApp()
-    
-    try:
-        await app.initialize()
+    async with FamilyEmotionsApp() as app:
         yield app
-    finally:
-        await app.stop()
 
 
 async def health_check() -> bool:
     """Perform application health check."""
+    # Reuse the shared container's pools; only connect (and later close) what isn't open yet
+    connect_here = not container.is_connected
+    
     try:
-        # Quick health check without full initialization
-        from core.container import Container
-        temp_container = Container()
-        
-        # Check database connection
-        await temp_container._init_database()
+        if connect_here:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(container._init_database())
+                tg.create_task(container._init_cache())
         
-        # Check cache connection
-        await temp_container._init_cache()
-        
-        # Cleanup
-        await temp_container.cleanup()
+        # One SELECT 1 and one PING instead of trusting that the pools opened
+        await container.ping()
         
         logger.info("Health check passed")
         return True
         
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         return False
+    
+    finally:
+        if connect_here:
+            await container.cleanup()
 
 
 async def run_migrations():
@@ -219,10 +244,13 @@ async def run_migrations():
         logger.info("Database migrations completed successfully")
         
     except Exception as e:
-        logger.error(f"Database migration failed: {e}")
+        logger.error("Database migration failed: %s", e)
         sys.exit(1)
     finally:
-        await container.db_manager.close()
+        try:
+            await asyncio.wait_for(asyncio.shield(container.db_manager.close()), CLEANUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Database close did not finish within %ss", CLEANUP_TIMEOUT)
 
 
 async def create_test_data():
@@ -237,29 +265,24 @@ async def create_test_data():
         # Initialize container
         await container.initialize()
         
-        # Create test user
-        user = await container.user_service.create_user(
+        # Create test user and child in one transaction
+        user, child = await container.user_service.create_user_with_child(
             telegram_id=123456789,
             first_name="Test",
             last_name="User",
             username="testuser",
-            language_code="en"
-        )
-        
-        # Create test child
-        child = await container.family_service.add_child(
-            parent_id=user.id,
-            name="Test Child",
-            age=7,
+            language_code="en",
+            child_name="Test Child",
+            child_age=7,
             personality_traits="Creative and sensitive, loves drawing",
             interests="Art, books, puzzles",
             special_needs="None"
         )
         
-        logger.info(f"Created test user {user.id} with child {child.id}")
+        logger.info("Created test user %s with child %s", user.id, child.id)
         
     except Exception as e:
-        logger.error(f"Failed to create test data: {e}")
+        logger.error("Failed to create test data: %s", e)
     finally:
         await container.cleanup()
 
@@ -284,33 +307,38 @@ def main():
     
     args = parser.parse_args()
     
+    _ensure_logging()
+    
     # Update environment if specified
     if args.env != settings.environment:
         settings.environment = args.env
     
-    # Run based on mode
-    if args.mode == "health":
-        result = asyncio.run(health_check())
-        sys.exit(0 if result else 1)
-    
-    elif args.mode == "migrate":
-        asyncio.run(run_migrations())
-    
-    elif args.mode == "test-data":
-        asyncio.run(create_test_data())
+    # One loop for the whole invocation, libuv-based when available
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
     
-    elif args.mode == "run":
-        if settings.is_production:
-            logger.info("Starting in production mode")
-            asyncio.run(run_production_server())
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        # Run based on mode
+        if args.mode == "health":
+            result = runner.run(health_check())
+            sys.exit(0 if result else 1)
+        
+        elif args.mode == "migrate":
+            runner.run(run_migrations())
+        
+        elif args.mode == "test-data":
+            runner.run(create_test_data())
+        
+        elif args.mode == "run":
+            if settings.is_production:
+                logger.info("Starting in production mode")
+                runner.run(run_production_server())
+            else:
+                logger.info("Starting in development mode")
+                runner.run(run_development_server())
+        
         else:
-            logger.info("Starting in development mode")
-            asyncio.run(run_development_server())
-    
-    else:
-        parser.print_help()
-        sys.exit(1)
-
+            parser.print_help()
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -15,6 +15,12 @@ except ImportError as e:
     print(f"❌ Failed to import localization: {e}")
     sys.exit(1)
 
+# Patterns compiled once, mirroring src/infrastructure/telegram/validators.py
+_NAME_RE = re.compile(r'^[а-яА-ЯёЁa-zA-Z\s\-\']+$')
+_WHITESPACE_RE = re.compile(r'\s+')
+_UNSAFE_CHARS_RE = re.compile(r'[^\w\sа-яА-ЯёЁ.,!?;:()\"\'-]')
+_NON_LETTER_RE = re.compile(r'[^a-zA-Zа-яА-ЯёЁ]+')
+
 # Simple validator for testing without telegram dependencies
 class TestInputValidator:
     @staticmethod
@@ -24,15 +30,17 @@ class TestInputValidator:
         name = name.strip()
         if len(name) < 2:
             return False, "Имя слишком короткое"
-        if not re.match(r'^[а-яА-ЯёЁa-zA-Z\s\-\']+$', name):
+        if name.isascii() and name.isalpha():
+            return True, None
+        if not _NAME_RE.match(name):
             return False, "Имя может содержать только буквы, пробелы и дефисы"
         return True, None
     
     @staticmethod
     def validate_age(age_str):
         try:
-            age = int(age_str.strip())
-        except (ValueError, AttributeError):
+            age = int(age_str)
+        except (ValueError, TypeError):
             return False, "Возраст должен быть числом"
         if age < 0:
             return False, "Возраст должен быть больше 0"
@@ -42,21 +50,19 @@ class TestInputValidator:
     
     @staticmethod
     def detect_language(text):
-        if not text:
-            return 'other'
-        cyrillic_count = len(re.findall(r'[а-яА-ЯёЁ]', text))
-        total_letters = len(re.findall(r'[a-zA-Zа-яА-ЯёЁ]', text))
-        if total_letters == 0:
+        if not text or text.isascii():
             return 'other'
-        cyrillic_ratio = cyrillic_count / total_letters
-        return 'ru' if cyrillic_ratio > 0.5 else 'other'
+        letters = _NON_LETTER_RE.sub('', text)
+        total_letters = len(letters)
+        cyrillic_count = total_letters - len(letters.encode('ascii', 'ignore'))
+        return 'ru' if cyrillic_count * 2 > total_letters else 'other'
     
     @staticmethod
     def sanitize_russian_text(text):
         if not text:
             return text
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'[^\w\sа-яА-ЯёЁ.,!?;:()\"\'-]', '', text)
+        text = _WHITESPACE_RE.sub(' ', text.strip())
+        text = _UNSAFE_CHARS_RE.sub('', text)
         return text
 
 def test_localization():